@@ -31,14 +31,13 @@
 
 """
 
-from copy import copy
 from scimath.units.unit import unit, dimensionless, none
 
 # basic SI units
 
-meter = unit(1.0, (1, 0, 0, 0, 0, 0, 0))
-kilogram = unit(1.0, (0, 1, 0, 0, 0, 0, 0))
-second = unit(1.0, (0, 0, 1, 0, 0, 0, 0))
+meter = unit(1.0, (1, 0, 0, 0, 0, 0, 0), label='meter')
+kilogram = unit(1.0, (0, 1, 0, 0, 0, 0, 0), label='kilogram')
+second = unit(1.0, (0, 0, 1, 0, 0, 0, 0), label='second')
 ampere = unit(1.0, (0, 0, 0, 1, 0, 0, 0))
 mole = unit(1.0, (0, 0, 0, 0, 0, 1, 0))
 candela = unit(1.0, (0, 0, 0, 0, 0, 0, 1))
@@ -46,65 +45,44 @@ candela = unit(1.0, (0, 0, 0, 0, 0, 0, 1))
 
 # the 22 derived SI units with special names
 
-radian = copy(dimensionless)  # plane angle
-radian.label = 'radian'
+radian = dimensionless.with_label('rad')  # plane angle
 
-steradian = copy(dimensionless)  # solid angle
-steradian.label = 'steradian'
-hertz = 1 / second  # frequency
-hertz.label = 'Hz'
-newton = meter * kilogram / second**2  # force
-newton.label = 'newton'
+steradian = dimensionless.with_label('steradian')  # solid angle
+hertz = (1 / second).with_label('Hz')  # frequency
+newton = (meter * kilogram / second**2).with_label('newton')  # force
 
-pascal = newton / meter**2  # pressure
-pascal.label = 'pascal'
+pascal = (newton / meter**2).with_label('Pa')  # pressure
 
-joule = newton * meter  # work, heat
-joule.label = 'joule'
+joule = (newton * meter).with_label('joule')  # work, heat
 
-watt = joule / second  # power, radiant flux
-watt.label = 'watt'
-coulomb = ampere * second  # electric charge
-coulomb.label = 'coulomb'
+watt = (joule / second).with_label('watt')  # power, radiant flux
+coulomb = (ampere * second).with_label('coulomb')  # electric charge
 
-volt = watt / ampere  # electric potential difference
-volt.label = 'volt'
+volt = (watt / ampere).with_label('volt')  # electric potential difference
 
-farad = coulomb / volt  # capacitance
-farad.label = 'farad'
+farad = (coulomb / volt).with_label('farad')  # capacitance
 
-ohm = volt / ampere  # electric resistance
-ohm.label = 'ohm'
+ohm = (volt / ampere).with_label('ohm')  # electric resistance
 
-siemens = ampere / volt  # electric conductance
-siemens.label = 'siemens'
+siemens = (ampere / volt).with_label('siemens')  # electric conductance
 
-weber = volt * second  # magnetic flux
-weber.label = 'weber'
+weber = (volt * second).with_label('weber')  # magnetic flux
 
-tesla = weber / meter**2  # magnetic flux density
-tesla.label = 'tesla'
+tesla = (weber / meter**2).with_label('tesla')  # magnetic flux density
 
-henry = weber / ampere  # inductance
-henry.label = 'henry'
+henry = (weber / ampere).with_label('henry')  # inductance
 
-lumen = candela * steradian  # luminus flux
-lumen.label = 'lumen'
+lumen = (candela * steradian).with_label('lumen')  # luminus flux
 
-lux = lumen / meter**2  # illuminance
-lux.label = 'lux'
+lux = (lumen / meter**2).with_label('lux')  # illuminance
 
-becquerel = 1 / second  # radioactivity
-becquerel.label = 'becquerel'
+becquerel = (1 / second).with_label('becquerel')  # radioactivity
 
-gray = joule / kilogram  # absorbed dose
-gray.label = 'gray'
+gray = (joule / kilogram).with_label('gray')  # absorbed dose
 
-sievert = joule / kilogram  # dose equivalent
-sievert.label = 'sievert'
+sievert = (joule / kilogram).with_label('sievert')  # dose equivalent
 
-katal = mole / second  # catalytic activity
-katal.label = 'katal'
+katal = (mole / second).with_label('katal')  # catalytic activity
 
 # prefixes
 
@@ -13,5 +13,20 @@
 
 """ Unit definitions and management utilities.
 """
-from .convert import convert, parser
-from scimath.units.unit_manager import unit_manager
+from .convert import (
+    convert, convert_chunked, convert_many, make_converter, parser
+)
+from . import unit_manager
+
+# The name of the unit_manager module is kept for the unit manager singleton,
+# which is only created when first used, see __getattr__().  The module is
+# imported first: the name is not bound again when it is imported later.
+del unit_manager
+
+
+def __getattr__(name):
+    if name == 'unit_manager':
+        from scimath.units.unit_manager import unit_manager
+        globals()['unit_manager'] = unit_manager
+        return unit_manager
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
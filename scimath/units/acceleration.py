@@ -24,10 +24,8 @@ from .time import second
 # Definitions:
 #####################################################################
 
-feet_per_second_squared = foot / second**2
-feet_per_second_squared.label = 'ft/s^2'
-meters_per_second_squared = meter / second**2
-meters_per_second_squared.label = 'm/s^2'
+feet_per_second_squared = (foot / second**2).with_label('ft/s^2')
+meters_per_second_squared = (meter / second**2).with_label('m/s^2')
 
 #####################################################################
 # Aliases:
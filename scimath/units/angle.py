@@ -26,32 +26,26 @@ from .SI import radian
 # Definitions:
 #############################################################################
 
-degree = radian * math.pi / 180.
-degree.label = 'deg'
+degree = (radian * math.pi / 180.).with_label('deg')
 degrees = degree
 deg = degree
 
-radian.label = 'rad'
 radians = radian
 
-grad = degree * 0.9
-grad.label = '^g'
+grad = (degree * 0.9).with_label('^g')
 grads = grad
 gon = grad
 gons = grad
 
-minute = degree / 60.0
+minute = (degree / 60.0).with_label("'")
 minutes = minute
-minute.label = "'"
-second = degree / 3600.0
-second.label = '"'
+second = (degree / 3600.0).with_label('"')
 seconds = second
 
 sign = degree * 30
 signs = sign
 
-revolution = 360 * degree
-revolution.label = 'r'
+revolution = (360 * degree).with_label('r')
 revolutions = revolution
 circle = revolution
 circles = circle
@@ -66,6 +60,5 @@ right_angles = quadrant
 sextant = 60 * degree
 sextants = sextant
 
-mil = 90 / 1600.0 * degree
-mil.label = 'mil'
+mil = (90 / 1600.0 * degree).with_label('mil')
 mils = mil
@@ -22,7 +22,9 @@ from scimath.units.unit import unit, dimensionless
 from .quantity import Quantity
 from .meta_quantity import MetaQuantity
 
-from .convert import convert, parser, convert_str
+from .convert import (
+    convert, convert_chunked, convert_many, make_converter, parser, convert_str
+)
 
 from .has_units import has_units
 from .function_signature import (call_signature, def_signature,
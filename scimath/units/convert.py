@@ -8,18 +8,273 @@
 #
 # Thanks for using Enthought open source!
 
-""" Defines the convert, convert_str and parser function
+""" Defines the convert, convert_many, convert_chunked, convert_str and parser
+functions
 """
 
+from operator import attrgetter
+
 import numpy
-from .unit import InvalidConversion
+from .lru_cache import LRUCache
+from .unit import InvalidConversion, dimensionless, unit
+
+
+#: Number of elements processed at a time when converting an array in place
+#: with an offset, so that the scale and shift are done in one sweep over
+#: memory.
+_BLOCK_SIZE = 65536
+
+#: Default number of elements read and written at a time by convert_chunked.
+_CHUNK_SIZE = 2 ** 20
+
+#: Cache of the ConversionPlan objects used by convert(), keyed on the
+#: identities of the (from_unit, to_unit) pair.
+conversion_plan_cache = LRUCache(max_size=1024)
+
+
+class ConversionPlan(object):
+    """ The precomputed arithmetic needed to convert between two units.
+
+    `kind` describes how the two units are related, and so how a value in
+    `from_unit` is converted to `to_unit`:
+
+    * 'identity': the units are equal and values are returned unchanged.
+    * 'direct': the units have the same derivation; values are converted as
+      ``value * factor + offset``, the factor being the ratio of the
+      magnitudes of the units.
+    * 'reciprocal': the derivation of one unit is the inverse of the other,
+      e.g. slowness and velocity; values are converted as
+      ``factor / value``, the factor being the inverse of the product of the
+      magnitudes of the units.
+
+    The kind is decided from the derivations of the units, so building a plan
+    does not rely on catching InvalidConversion.  Dimensionally incompatible
+    units raise InvalidConversion.
+
+    Plans are shared through `conversion_plan_cache`, so they are read-only.
+    """
+
+    __slots__ = ('_from_unit', '_to_unit', '_kind', '_factor', '_offset',
+                 '_identity')
+
+    def __init__(self, from_unit, to_unit):
+        self._from_unit = from_unit
+        self._to_unit = to_unit
+        self._identity = from_unit == to_unit
+
+        if self._identity:
+            self._kind = 'identity'
+            self._factor = 1.0
+            self._offset = 0.0
+            return
+
+        self._kind = conversion_kind(from_unit, to_unit)
+        if self._kind == 'direct':
+            factor = float(from_unit / to_unit)
+            try:
+                offset = (from_unit.offset * factor) - to_unit.offset
+            except AttributeError:
+                offset = 0.0
+        elif self._kind == 'reciprocal':
+            factor = 1.0 / float(from_unit * to_unit)
+            offset = 0.0
+        else:
+            raise InvalidConversion(from_unit / to_unit)
+
+        self._factor = factor
+        self._offset = offset
+
+    from_unit = property(attrgetter('_from_unit'),
+                         doc="The unit of the values converted.")
+    to_unit = property(attrgetter('_to_unit'),
+                       doc="The unit the values are converted to.")
+    kind = property(attrgetter('_kind'),
+                    doc="'identity', 'direct' or 'reciprocal'.")
+    factor = property(attrgetter('_factor'),
+                      doc="The factor values are multiplied or divided by.")
+    offset = property(attrgetter('_offset'),
+                      doc="The offset added to the scaled values.")
+    identity = property(attrgetter('_identity'),
+                        doc="Whether the units are equal.")
+
+    @property
+    def inverted(self):
+        """ Whether the factor was obtained by inverting the units.
+        """
+        return self._kind == 'reciprocal'
+
+    def apply(self, value):
+        """ Converts value from `from_unit` to `to_unit`.
+        """
+        if self._identity:
+            return value
+
+        # test if it is a UnitArray without importing UnitArray to keep
+        # the dependencies low for this module
+        if isinstance(value, numpy.ndarray) and hasattr(value, 'units'):
+            return self(value)
+
+        if self._kind == 'reciprocal':
+            return self._factor / value
+        return value * self._factor + self._offset
+
+    def __call__(self, value, out=None, dtype=None):
+        """ Converts value, optionally into a preallocated buffer.
+
+        Parameters
+        ----------
+        value : float or array
+            The value to convert, in `from_unit`.
+        out : ndarray, optional
+            The array in which to store the result.  It may be `value`
+            itself.
+        dtype : numpy dtype, 'preserve' or 'promote', optional
+            The dtype of the result; see `resolve_dtype`.
+
+        Returns
+        -------
+        The converted value; `out` if it was given.  The result of converting
+        a UnitArray is a UnitArray with the same units attribute.
+        """
+        if isinstance(value, numpy.ndarray) and hasattr(value, 'units'):
+            # Convert the plain data: the arithmetic of a UnitArray would add
+            # the offset as a quantity in the units of the array.
+            data = value.view(numpy.ndarray)
+            if out is value:
+                self(data, out=data, dtype=dtype)
+                return value
+            if out is not None:
+                self(data, out=out.view(numpy.ndarray), dtype=dtype)
+                return out
+            result = self(data, dtype=dtype)
+            if result is data:
+                return value
+            result = result.view(type(value))
+            result.units = value.units
+            return result
+
+        if isinstance(out, numpy.ndarray) and hasattr(out, 'units'):
+            self(value, out=out.view(numpy.ndarray), dtype=dtype)
+            return out
+
+        dtype = resolve_dtype(value, dtype)
+        value_dtype = getattr(value, 'dtype', None)
+        if dtype is not None and value_dtype is not None and \
+                dtype == value_dtype:
+            dtype = None
+
+        if out is None and dtype is None:
+            return self.apply(value)
+
+        if self._identity:
+            if out is None:
+                if isinstance(value, numpy.ndarray):
+                    return value.astype(dtype, copy=False)
+                return dtype.type(value)
+            if out is not value:
+                numpy.copyto(out, value, casting='same_kind')
+            return out
+
+        if (out is value and self._offset and dtype is None and
+                out.size > _BLOCK_SIZE and out.flags.c_contiguous):
+            flat = out.reshape(-1)
+            for start in range(0, flat.size, _BLOCK_SIZE):
+                block = flat[start:start + _BLOCK_SIZE]
+                numpy.multiply(block, self._factor, out=block)
+                numpy.add(block, self._offset, out=block)
+            return out
+
+        if self._kind == 'reciprocal':
+            return numpy.divide(self._factor, value, out=out, dtype=dtype)
+
+        result = numpy.multiply(value, self._factor, out=out, dtype=dtype)
+        if self._offset:
+            if isinstance(result, numpy.ndarray):
+                numpy.add(result, self._offset, out=result)
+            else:
+                result = result + result.dtype.type(self._offset)
+        return result
+
+
+def resolve_dtype(value, dtype):
+    """ Returns the dtype that converting value should produce.
+
+    Parameters
+    ----------
+    value : float or array
+        The value being converted.
+    dtype : None, 'preserve', 'promote' or numpy dtype
+        The conversion policy:
+
+        * None: follow numpy's casting rules for ``value * factor``; None is
+          returned.
+        * 'preserve': keep the floating point (or complex) dtype of value, so
+          that float32 data stays float32.  Integer and boolean values, which
+          cannot hold the result of scaling, are converted to float64.
+        * 'promote': use at least double precision, i.e. the result type of
+          value's dtype and float64.
+        * any other value is interpreted as an explicit numpy dtype.
+
+    Returns
+    -------
+    dtype : numpy.dtype or None
+    """
+    if dtype is None:
+        return None
+
+    if isinstance(dtype, str) and dtype in ('preserve', 'promote'):
+        value_dtype = getattr(value, 'dtype', None)
+        if value_dtype is None:
+            value_dtype = numpy.asarray(value).dtype
+        if dtype == 'preserve':
+            if value_dtype.kind in 'fc':
+                return value_dtype
+            return numpy.dtype(numpy.float64)
+        return numpy.result_type(value_dtype, numpy.float64)
+
+    return numpy.dtype(dtype)
+
+
+def conversion_kind(from_unit, to_unit):
+    """ Returns how a value can be converted from one unit to another.
+
+    Returns 'direct' if the units have the same dimensions, 'reciprocal' if
+    the dimensions of one are the inverse of the other's, and None if the
+    units are incompatible.
+    """
+    if not (isinstance(from_unit, unit) and isinstance(to_unit, unit)):
+        # Plain numbers are dimensionless.
+        from_unit = from_unit if isinstance(from_unit, unit) else dimensionless
+        to_unit = to_unit if isinstance(to_unit, unit) else dimensionless
+
+    if from_unit._same_dimensions(to_unit):
+        return 'direct'
+    if from_unit._inverse_dimensions(to_unit):
+        return 'reciprocal'
+    return None
+
+
+def get_conversion_plan(from_unit, to_unit):
+    """ Returns the (possibly cached) ConversionPlan between two units.
+
+    Plans are cached on the identity of the units; the plan keeps references
+    to both units so that the identities cannot be reused while the plan is
+    in the cache.
+    """
+    key = (id(from_unit), id(to_unit))
+    plan = conversion_plan_cache.get(key)
+    if (plan is None or plan.from_unit is not from_unit or
+            plan.to_unit is not to_unit):
+        plan = ConversionPlan(from_unit, to_unit)
+        conversion_plan_cache.add(key, plan)
+    return plan
 
 
 #####################################################################
 # Definitions:
 #####################################################################
 
-def convert(value, from_unit, to_unit):
+def convert(value, from_unit, to_unit, inplace=False, dtype=None):
     """ Coverts value from one unit to another.
 
         Parameters
@@ -30,6 +285,17 @@ def convert(value, from_unit, to_unit):
             implied units of 'value'
         to_unit : scimath.unit object
             implied units of the returned float
+        inplace : bool
+            if True and value is an ndarray, overwrite its contents with the
+            converted values instead of allocating new arrays.  The array must
+            have a floating point dtype.  The units attribute of a UnitArray is
+            left untouched.  Ignored for other types of value.
+        dtype : None, 'preserve', 'promote' or numpy dtype
+            the dtype policy for the result.  The default follows numpy's
+            casting rules; 'preserve' keeps floating point dtypes such as
+            float32 (integers become float64), 'promote' computes in at least
+            double precision and any other value is used as the result dtype.
+            See `resolve_dtype`.
 
         Returns
         -------
@@ -42,8 +308,16 @@ def convert(value, from_unit, to_unit):
         Checks first to see if from_unit and to_unit are equal and passes value
         back in that case. Then convert() forms a conversion factor by dividing the
         units. The offset is zero unless explicitly set otherwise in the unit
-        definition. Handling of UnitArrays is done by checking whether value is a
-        numpy.ndarray.
+        definition. If the derivation of to_unit is the inverse of that of
+        from_unit, as for slowness and velocity, the value is inverted instead:
+        conversion_factor / value. Handling of UnitArrays is done by checking
+        whether value is a numpy.ndarray; the data of a UnitArray is converted
+        the same way whatever inplace and dtype are, and its units attribute is
+        left untouched.
+
+        The factor and offset for a pair of units are computed once and kept
+        in `conversion_plan_cache`, so repeated conversions between the same
+        units only pay for the arithmetic.
 
         **Note**: Enthought has extended the original units implementation to
         handle temperature conversions.  Temperature units are a special case
@@ -62,47 +336,243 @@ def convert(value, from_unit, to_unit):
         differences.
     """
 
-    # TODO: it would be nice if this function could handle inversion as well as
-    # just scaling and also gave better error messages. For example:
-    '''
-    res = from_unit / to_unit
-
-    if  from_unit / to_unit is dimensionless:
-        # straight convert\
-        pass
-    elif  from_unit * to_unit is dimensionless:
-        # invert
-        pass
+    plan = conversion_plan_cache.get((id(from_unit), id(to_unit)))
+    if plan is None:
+        plan = get_conversion_plan(from_unit, to_unit)
+    if not inplace and dtype is None:
+        return plan.apply(value)
+    return _convert_with_plan(plan, value, inplace, dtype)
+
+
+def convert_many(values, from_units, to_units, inplace=False, out=None,
+                 dtype=None, max_workers=None):
+    """ Converts a sequence of values, each with its own units.
+
+        Parameters
+        ----------
+        values : sequence of floats or arrays
+            the values to convert
+        from_units : scimath.unit object or sequence of them
+            the units of each value, or one unit shared by all values
+        to_units : scimath.unit object or sequence of them
+            the units to convert each value to, or one unit for all values
+        inplace : bool
+            if True, overwrite each array in values with its converted values,
+            as in `convert`
+        out : sequence of arrays, optional
+            arrays in which to store the results, one per value
+        dtype : None, 'preserve', 'promote' or numpy dtype
+            the dtype policy for the results; see `convert`
+        max_workers : int, optional
+            if greater than 1, the conversions are spread over a pool of this
+            many threads.  numpy releases the GIL while converting arrays, so
+            this speeds up the conversion of large arrays.
+
+        Returns
+        -------
+        results : list
+            the converted values, in the order of values.
+
+        Description
+        -----------
+
+        The values are grouped by their pair of units and one conversion plan
+        is looked up per group, so converting many values with a few distinct
+        units costs little more than the arithmetic.  InvalidConversion is
+        raised before any value is converted if a pair of units is
+        incompatible.
+    """
+    values = list(values)
+    count = len(values)
+    from_units = _units_sequence(from_units, count, 'from_units')
+    to_units = _units_sequence(to_units, count, 'to_units')
+    if out is None:
+        out = [None] * count
+    elif len(out) != count:
+        raise ValueError("expected %d output arrays, got %d" %
+                         (count, len(out)))
+
+    groups = {}
+    for index, units in enumerate(zip(from_units, to_units)):
+        key = (id(units[0]), id(units[1]))
+        group = groups.get(key)
+        if group is None:
+            groups[key] = group = (get_conversion_plan(*units), [])
+        group[1].append(index)
+
+    results = [None] * count
+
+    def convert_group_member(job):
+        plan, index = job
+        results[index] = _convert_with_plan(plan, values[index], inplace,
+                                            dtype, out[index])
+
+    jobs = [(plan, index)
+            for plan, indices in groups.values() for index in indices]
+    if max_workers is not None and max_workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Consume the iterator so that exceptions are raised here.
+            list(executor.map(convert_group_member, jobs))
     else:
-        # dimensionally incompatible
-        pass
-    '''
+        for job in jobs:
+            convert_group_member(job)
+
+    return results
+
+
+def convert_chunked(value, from_unit, to_unit, out=None, dtype=None,
+                    chunk_size=_CHUNK_SIZE):
+    """ Converts an array block by block, for arrays larger than memory.
+
+        Parameters
+        ----------
+        value : ndarray
+            the array to convert, typically a numpy.memmap
+        from_unit : scimath.unit object
+            implied units of 'value'
+        to_unit : scimath.unit object
+            units of the result
+        out : ndarray, optional
+            the array, typically a writable numpy.memmap, in which to store
+            the result.  It must have the shape of value and may be value
+            itself.  If not given a new in-memory array is allocated.
+        dtype : None, 'preserve', 'promote' or numpy dtype
+            the dtype policy for the result when out is not given; see
+            `convert`
+        chunk_size : int
+            the number of elements converted at a time
+
+        Returns
+        -------
+        out : ndarray
+            the converted values.
+
+        Description
+        -----------
+
+        The array is read and written one block of at most chunk_size
+        elements at a time, in storage order, so the memory used by the
+        conversion is bounded by the block size whatever the size of value.
+        Blocks are taken from the flattened array when it is C or Fortran
+        contiguous, and from consecutive slices along its outermost axis in
+        memory otherwise.  The units attribute of a UnitArray is kept, as
+        in `convert`.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive, got %r" % chunk_size)
 
-    # TODO: This is my guess at what Lowell did to improve performance...
-    # I need to confirm that I'm doing the same thing he did (TNV)
+    plan = get_conversion_plan(from_unit, to_unit)
+    result = out
+    if out is None:
+        result_dtype = resolve_dtype(value, dtype)
+        if result_dtype is None:
+            result_dtype = numpy.result_type(value.dtype, plan.factor)
+        # In the memory layout of value, so that both are read and written
+        # in the same order.
+        out = numpy.empty_like(value, dtype=result_dtype, subok=False)
+        result = out
+        if hasattr(value, 'units'):
+            # Like convert(), keep the units attribute of a UnitArray.
+            result = out.view(type(value))
+            result.units = value.units
+    elif out.shape != value.shape:
+        raise ValueError("out has shape %s, expected %s" %
+                         (out.shape, value.shape))
 
-    if from_unit == to_unit:
-        return value
+    source = value.view(numpy.ndarray)
+    destination = out.view(numpy.ndarray)
+    if source.ndim == 0:
+        plan(source, out=destination)
+        return result
+
+    if source.flags.c_contiguous and destination.flags.c_contiguous:
+        source = source.reshape(-1)
+        destination = destination.reshape(-1)
+    elif source.flags.f_contiguous and destination.flags.f_contiguous:
+        # The transpose of a Fortran ordered array is C ordered.
+        source = source.T.reshape(-1)
+        destination = destination.T.reshape(-1)
     else:
-        try:
-            # try a straight conversion
-            factor = float(from_unit / to_unit)
-        except InvalidConversion as ex:
-            # try an inversion
-            factor = from_unit * to_unit
-            if not isinstance(factor, float):
-                raise ex
-        try:
-            offset = (from_unit.offset * factor) - to_unit.offset
-        except AttributeError:
-            offset = 0.0
+        # Take blocks along the axis with the largest stride, the outermost
+        # in memory.
+        axis = int(numpy.argmax(numpy.abs(source.strides)))
+        source = numpy.moveaxis(source, axis, 0)
+        destination = numpy.moveaxis(destination, axis, 0)
+
+    row_size = source[:1].size or 1
+    step = max(1, chunk_size // row_size)
+    for start in range(0, len(source), step):
+        stop = start + step
+        plan(source[start:stop], out=destination[start:stop])
+
+    return result
+
+
+def _units_sequence(units, count, name):
+    """ Returns units as a list of count units for convert_many().
+    """
+    if isinstance(units, unit):
+        return [units] * count
+    units = list(units)
+    if len(units) != count:
+        raise ValueError("expected %d %s, got %d" % (count, name, len(units)))
+    return units
+
+
+def _convert_with_plan(plan, value, inplace=False, dtype=None, out=None):
+    """ Converts value with a ConversionPlan; see `convert`.
+    """
+    if inplace and out is None and isinstance(value, numpy.ndarray):
+        new_dtype = resolve_dtype(value, dtype)
+        if new_dtype is None:
+            # The dtype numpy gives the result, e.g. float64 for integers.
+            new_dtype = value.dtype if plan.identity else \
+                numpy.result_type(value.view(numpy.ndarray), plan.factor)
+        if new_dtype != value.dtype:
+            raise ValueError("cannot convert an array of dtype %s in "
+                             "place: the result has dtype %s" %
+                             (value.dtype, new_dtype))
+        out = value
 
-    # test if it is a UnitArray without importing UnitArray to keep
-    # the dependencies low for this module
-    if isinstance(value, numpy.ndarray) and hasattr(value, 'units'):
-        return value * factor + value.units * offset
+    return plan(value, out=out, dtype=dtype)
 
-    return value * factor + offset
+
+def make_converter(from_unit, to_unit):
+    """ Returns a reusable function converting values between two units.
+
+    The dimensional check and the conversion factor are computed once, when
+    the converter is made, rather than on every call.
+
+        Parameters
+        ----------
+        from_unit : scimath.unit object
+            implied units of the values passed to the converter
+        to_unit : scimath.unit object
+            units of the values returned by the converter
+
+        Returns
+        -------
+        converter : callable
+            ``converter(value, out=None, dtype=None)`` returns `value`
+            converted to `to_unit`.  When `out` is given the result is
+            written into it, which may be `value` itself, and no temporary
+            arrays are created.
+
+        Raises
+        ------
+        InvalidConversion
+            if the units are not dimensionally compatible.
+
+        Examples
+        --------
+        >>> from scimath.units.length import feet, meter
+        >>> to_meters = make_converter(feet, meter)
+        >>> to_meters(10.0)
+        3.048
+    """
+    return get_conversion_plan(from_unit, to_unit)
 
 
 def convert_str(value, from_unit_string, to_unit_string):
@@ -29,14 +29,11 @@ from .volume import cubic_centimeter, cubic_meter, us_fluid_gallon
 # Definitions:
 #############################################################################
 
-grams_per_cubic_centimeter = gram / cubic_centimeter
-grams_per_cubic_centimeter.label = 'g/cc'
-kilograms_per_cubic_meter = kilogram / cubic_meter
-kilograms_per_cubic_meter.label = 'kg/m3'
+grams_per_cubic_centimeter = (gram / cubic_centimeter).with_label('g/cc')
+kilograms_per_cubic_meter = (kilogram / cubic_meter).with_label('kg/m3')
 # Taken from geo_units pressure gradient section
 # TODO: should this be here (density)?
-lb_per_gal = pound / us_fluid_gallon
-lb_per_gal.label = 'lb/gal'
+lb_per_gal = (pound / us_fluid_gallon).with_label('lb/gal')
 
 
 #############################################################################
@@ -22,13 +22,11 @@ from scimath.units.unit import one, dim
 # fractional or percentage units.
 ###############################################################################
 
-fractional = copy(dimensionless)
-fractional.label = 'V/V'
+fractional = dimensionless.with_label('V/V')
 fraction = fractional
 ratio = frac = fract = fractional
 
-percent = fractional / 100.
-percent.label = '%'
+percent = (fractional / 100.).with_label('%')
 percentage = percent
 pct = percent
 
@@ -38,6 +36,5 @@ pct = percent
 
 parts_per_one = copy(dimensionless)
 
-parts_per_million = parts_per_one / 1e6
-parts_per_million.label = 'ppm'
+parts_per_million = (parts_per_one / 1e6).with_label('ppm')
 ppm = parts_per_million
@@ -21,7 +21,6 @@
 
 """
 
-from copy import copy
 
 from scimath.units.SI import ampere, coulomb, farad, henry, joule, ohm, \
     meter, micro, milli, pico, siemens, tesla, volt, watt, weber
@@ -34,8 +33,7 @@ amp = ampere
 amps = ampere
 amperes = ampere
 
-milli_ampere = milli * ampere
-milli_ampere.label = 'mA'
+milli_ampere = (milli * ampere).with_label('mA')
 mA = milli_ampere
 milli_amp = milli_ampere
 
@@ -47,8 +45,7 @@ milli_amp = milli_ampere
 volts = volt
 v = volt
 
-millivolt = milli * volt
-millivolt.label = 'mV'
+millivolt = (milli * volt).with_label('mV')
 milli_volt = millivolt
 mv = millivolt
 millivolts = millivolt
@@ -58,8 +55,7 @@ millivolts = millivolt
 ###############################################################################
 
 ohms = ohm
-ohmm = ohm * meter
-ohmm.label = 'ohmm'
+ohmm = (ohm * meter).with_label('ohmm')
 ohm_m = ohmm
 ohm_meter = ohmm
 ohms_per_m = ohmm
@@ -69,12 +65,10 @@ ohms_per_meter = ohmm
 # capacitance
 ###############################################################################
 
-micro_farad = micro * farad
-micro_farad.label = 'uf'
+micro_farad = (micro * farad).with_label('uf')
 mf = micro_farad
 
-pico_farad = pico * farad
-pico_farad.label = 'pf'
+pico_farad = (pico * farad).with_label('pf')
 pf = pico_farad
 
 ###############################################################################
@@ -82,20 +76,16 @@ pf = pico_farad
 ###############################################################################
 
 siemen = siemens
-mSiemens = milli * siemens
-mSiemens.label = 'mS'
+mSiemens = (milli * siemens).with_label('mS')
 mSiemen = mSiemens
 mS = mSiemens
 
-siemens_per_meter = siemens / meter
-siemens_per_meter.label = 'S/m'
+siemens_per_meter = (siemens / meter).with_label('S/m')
 siemens_per_m = siemens_per_meter
 
-mho = copy(siemens)
-mho.label = 'mho'
+mho = siemens.with_label('mho')
 
-mmho = milli * siemens
-mmho.label = 'mmho'
+mmho = (milli * siemens).with_label('mmho')
 
 ###############################################################################
 # Inductance
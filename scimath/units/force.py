@@ -28,6 +28,5 @@ from .SI import newton
 
 N = newton
 
-lbf = 4.44822 * newton
-lbf.label = 'lbf'
+lbf = (4.44822 * newton).with_label('lbf')
 lbs = lbf
@@ -23,12 +23,9 @@ from .time import minute
 # Definitions:
 #############################################################################
 
-hertz.label = 'Hz'
-kilohertz = kilo * hertz
-kilohertz.label = 'kHz'
+kilohertz = (kilo * hertz).with_label('kHz')
 
-rpm = 1 / minute
-rpm.label = 'rpm'
+rpm = (1 / minute).with_label('rpm')
 RPM = rpm
 
 #############################################################################
@@ -44,16 +44,14 @@ from scimath.units.volume import cubic_centimeter, cubic_meter, \
 ###############################################################################
 # impedance_units          g*km/cc/s, g*f/cc/s
 ###############################################################################
-g_km_per_cc_s = (grams * kilometers) / (cubic_centimeter * second)
-g_km_per_cc_s.label = 'g*km/(cc*s)'
-g_ft_per_cc_s = (grams * foot) / (cubic_centimeter * second)
-g_ft_per_cc_s.label = 'g*ft/(cc*s)'
+g_km_per_cc_s = ((grams * kilometers) /
+                 (cubic_centimeter * second)).with_label('g*km/(cc*s)')
+g_ft_per_cc_s = ((grams * foot) /
+                 (cubic_centimeter * second)).with_label('g*ft/(cc*s)')
 
 # This is the MKS variant.
-rayl = pascal * second / meter
-rayl.label = 'Rayl'
-mrayl = mega * rayl
-mrayl.label = 'MRayl'
+rayl = (pascal * second / meter).with_label('Rayl')
+mrayl = (mega * rayl).with_label('MRayl')
 
 ###############################################################################
 # modulus_units            GPa, MPa
@@ -66,27 +64,22 @@ mrayl.label = 'MRayl'
 # Photoelectric absorption factor
 ###############################################################################
 
-barns_per_electron = copy(dimensionless)
-barns_per_electron.label = 'b/e'
+barns_per_electron = dimensionless.with_label('b/e')
 
 ###############################################################################
 # pressure_gradient_units  psi/f, MPa/m, MPa/100f
 ###############################################################################
 
-psi_per_f = psi / foot
-psi_per_f.label = 'psi/ft'
+psi_per_f = (psi / foot).with_label('psi/ft')
 psi_per_ft = psi_per_f
 
-MPa_per_m = MPa / meter
-MPa_per_m.label = 'MPa/m'
+MPa_per_m = (MPa / meter).with_label('MPa/m')
 
 psi_per_ft = pounds_per_square_inch / foot
 
-MPa_per_f = MPa / foot
-MPa_per_f.label = 'MPa/ft'
+MPa_per_f = (MPa / foot).with_label('MPa/ft')
 MPa_per_ft = MPa_per_f
-MPa_per_100f = MPa / (100 * foot)
-MPa_per_100f.label = 'MPa/100ft'
+MPa_per_100f = (MPa / (100 * foot)).with_label('MPa/100ft')
 MPa_per_100ft = MPa_per_100f
 
 ###############################################################################
@@ -96,8 +89,7 @@ MPa_per_100ft = MPa_per_100f
 lb_per_gal = lb / us_fluid_gallon
 lb_per_gallon = lb_per_gal
 
-ppg = copy(lb_per_gal)
-ppg.label = 'ppg'
+ppg = lb_per_gal.with_label('ppg')
 
 ###############################################################################
 # Gamma Ray
@@ -108,5 +100,4 @@ gapi = copy(dimensionless)
 ###############################################################################
 # psonic
 ###############################################################################
-us_per_ft = microsecond / foot
-us_per_ft.label = 'us/ft'
+us_per_ft = (microsecond / foot).with_label('us/ft')
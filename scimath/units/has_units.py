@@ -66,7 +66,8 @@ def simple_parser(lines):
     return input_lines, output_lines
 
 
-def has_units(func=None, summary='', doc='', inputs=None, outputs=None):
+def has_units(func=None, summary='', doc='', inputs=None, outputs=None,
+              dtype=None):
     r"""Function decorator: Wrap a standard python function for unit
     conversion. Note that conversion arguments must be supplied through
     the decorator arguments or in a formatted docstring as shown below.
@@ -100,6 +101,10 @@ def has_units(func=None, summary='', doc='', inputs=None, outputs=None):
              A string with the same format as the 'inputs' string that specifies
              the output variables.  This *is* an ordered list as there is no way
              to determine the functions outputs from the function object.
+        dtype : None, 'preserve', 'promote' or numpy dtype, optional
+             The dtype policy used when converting inputs to the units
+             expected by the function.  For example, 'preserve' keeps float32
+             arrays in float32.  See `scimath.units.convert.convert`.
 
         Description
         -----------
@@ -205,7 +210,8 @@ def has_units(func=None, summary='', doc='', inputs=None, outputs=None):
         for output_string in unitted_outputlines:
             outputs_list.append(Variable.from_string(output_string))
 
-        return _has_units(summary, doc, inputs_dict, outputs_list)(func)
+        return _has_units(summary, doc, inputs_dict, outputs_list,
+                          dtype)(func)
 
     else:  # func is None
 
@@ -225,10 +231,10 @@ def has_units(func=None, summary='', doc='', inputs=None, outputs=None):
         if not outputs_list:
             outputs_list = [Variable(name="result")]
 
-        return _has_units(summary, doc, inputs_dict, outputs_list)
+        return _has_units(summary, doc, inputs_dict, outputs_list, dtype)
 
 
-def _has_units(summary, doc, inputs, outputs):
+def _has_units(summary, doc, inputs, outputs, dtype=None):
     def units_wrap(_func_):
         # This special-cases the output of numpy.vectorize
         if isinstance(_func_, numpy.vectorize):
@@ -275,7 +281,8 @@ def _has_units(summary, doc, inputs, outputs):
             '    # Only convert units if at least one of the inputs already has units.',
             '    any_units = have_some_units($args_string)',
             '    if any_units:',
-            '        $args_string = convert_units(input_units, $args_string)',
+            '        $args_string = convert_units(input_units, $args_string,',
+            '                                     dtype=_dtype_)',
             '        # Now remove the units.',
             '        $args_string = strip_units($args_string)',
             '    results = $call',
@@ -306,6 +313,7 @@ def _has_units(summary, doc, inputs, outputs):
                 'input_list': input_list,
                 'output_list': output_list,
                 'input_units': input_units,
+                '_dtype_': dtype,
                 'output_units': output_units,
                 'summary': summary,
                 'doc': doc,
@@ -0,0 +1,86 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" A stand-in for a singleton which is only created when first used.
+"""
+
+# Standard library imports.
+import threading
+
+
+class LazyInstance(object):
+    """ Forwards attribute access to the object returned by a factory, which
+    is called on the first access.
+
+    This keeps singletons which are expensive to build, such as the unit
+    manager, from being built when their module is merely imported.  The
+    modules of such singletons give the object itself, see get_instance(),
+    rather than the LazyInstance to their users, so that it can be checked
+    with isinstance() or assigned to an Instance trait.
+
+    Parameters
+    ----------
+    factory : callable
+        Called without arguments to create the object.
+    """
+
+    __slots__ = ('_factory', '_instance', '_lock', '_creating')
+
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        # Reentrant, so that a factory using the object it is creating fails
+        # rather than deadlocks.
+        object.__setattr__(self, '_lock', threading.RLock())
+        object.__setattr__(self, '_creating', False)
+
+    def get_instance(self):
+        """ Returns the object, creating it if needed.
+
+        Raises a RuntimeError if called by the factory while it creates the
+        object.
+        """
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    if self._creating:
+                        raise RuntimeError(
+                            "%r used the object it is creating" %
+                            self._factory)
+                    object.__setattr__(self, '_creating', True)
+                    try:
+                        instance = self._factory()
+                    finally:
+                        object.__setattr__(self, '_creating', False)
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    @property
+    def created(self):
+        """ Whether the object has been created.
+        """
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get_instance(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get_instance(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self.get_instance(), name)
+
+    def __dir__(self):
+        return dir(self.get_instance())
+
+    def __repr__(self):
+        return repr(self.get_instance())
@@ -38,23 +38,15 @@ from .SI import kilo, centi, milli, micro, nano
 # Data taken from Appendix F of Halliday, Resnick, Walker,
 #     "Fundamentals of Physics", fourth edition, John Willey and Sons, 1993
 
-meter.label = 'meter'
-nanometer = nano * meter
-nanometer.label = 'nanometer'
-micrometer = micro * meter
-micrometer.label = 'micrometer'
-millimeter = milli * meter
-millimeter.label = 'millimeter'
-centimeter = centi * meter
-centimeter.label = 'centimeter'
-kilometer = kilo * meter
-kilometer.label = 'kilometer'
+nanometer = (nano * meter).with_label('nanometer')
+micrometer = (micro * meter).with_label('micrometer')
+millimeter = (milli * meter).with_label('millimeter')
+centimeter = (centi * meter).with_label('centimeter')
+kilometer = (kilo * meter).with_label('kilometer')
 
 # British units
-inch = 2.540 * centimeter
-inch.label = 'inch'
-foot = 12 * inch
-foot.label = 'feet'
+inch = (2.540 * centimeter).with_label('inch')
+foot = (12 * inch).with_label('feet')
 yard = 3 * foot
 mile = 5280 * foot
 
@@ -64,8 +56,7 @@ nautical_mile = 1852 * meter
 # others
 angstrom = 1e-10 * meter
 fermi = 1e-15 * meter
-survey_foot = 1200.0 / 3937.0 * meter
-survey_foot.label = 'us_foot'
+survey_foot = (1200.0 / 3937.0 * meter).with_label('us_foot')
 us_foot = survey_foot
 us_feet = survey_foot
 
@@ -0,0 +1,129 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Defines a small, bounded, thread-safe LRU cache with instrumentation.
+"""
+
+# Standard library imports.
+from collections import namedtuple, OrderedDict
+import threading
+
+
+#: Snapshot of the state of a cache, as returned by LRUCache.cache_info().
+CacheInfo = namedtuple(
+    'CacheInfo', ['hits', 'misses', 'evictions', 'max_size', 'size']
+)
+
+
+#: Marks a key missing from a cache.
+_MISSING = object()
+
+
+class LRUCache(object):
+    """ A mapping of bounded size that evicts the least recently used entry.
+
+    Lookups and insertions are O(1).  The number of hits, misses and
+    evictions is recorded so that the effectiveness of a cache can be
+    monitored.
+
+    Only insertions and evictions take the lock: a hit is a dict lookup and
+    a move to the end of the order, both atomic operations of OrderedDict,
+    so hits are cheap.  The statistics are not updated atomically and are
+    only approximate when the cache is shared between threads.
+
+    Parameters
+    ----------
+    max_size : int
+        The maximum number of entries kept.  A value of 0 disables caching.
+    """
+
+    def __init__(self, max_size=128):
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    #### 'LRUCache' interface #################################################
+
+    def _get_max_size(self):
+        return self._max_size
+
+    def _set_max_size(self, max_size):
+        with self._lock:
+            self._max_size = max_size
+            self._trim()
+
+    max_size = property(_get_max_size, _set_max_size)
+
+    def lookup(self, key):
+        """ Returns the value for key, marking it as most recently used.
+
+        Raises a KeyError if the key is not in the cache.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        """ Returns the value for key, or default if it is not cached.
+        """
+        data = self._data
+        value = data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        try:
+            data.move_to_end(key)
+        except KeyError:
+            # Evicted by another thread since the lookup.
+            pass
+        self.hits += 1
+        return value
+
+    def add(self, key, value):
+        """ Stores value under key, evicting the least recently used entries
+        if the cache is full.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._trim()
+
+    def clear(self):
+        """ Removes all entries and resets the statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def cache_info(self):
+        """ Returns a CacheInfo tuple describing the state of the cache.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self._max_size, len(self._data))
+
+    #### Python mapping protocol ##############################################
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    #### Private interface ####################################################
+
+    def _trim(self):
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
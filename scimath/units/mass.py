@@ -35,22 +35,15 @@ from .SI import kilo, centi, milli
 # Data taken from Appendix F of Halliday, Resnick, Walker, "Fundamentals of Physics",
 #     fourth edition, John Willey and Sons, 1993
 
-kilogram.label = 'kilogram'
-gram = kilogram / kilo
-gram.label = 'gram'
-centigram = centi * gram
-centigram.label = 'centigram'
-milligram = milli * gram
-milligram.label = 'milligram'
+gram = (kilogram / kilo).with_label('gram')
+centigram = (centi * gram).with_label('centigram')
+milligram = (milli * gram).with_label('milligram')
 
 metric_ton = 1000 * kilogram
 
-ounce = 28.35 * gram
-ounce.label = 'ounce'
-pound = 16 * ounce
-pound.label = 'pound'
-ton = 2000 * pound
-ton.label = 'ton'
+ounce = (28.35 * gram).with_label('ounce')
+pound = (16 * ounce).with_label('pound')
+ton = (2000 * pound).with_label('ton')
 
 #############################################################################
 # Aliases:
@@ -35,19 +35,15 @@ from scimath.units.unit import unit
 # aliases
 
 Pa = pascal
-Pa.label = 'Pa'
 
-kPa = kilo * pascal
-kPa.label = 'kPa'
+kPa = (kilo * pascal).with_label('kPa')
 
-MPa = mega * pascal
-MPa.label = 'MPa'
+MPa = (mega * pascal).with_label('MPa')
 mpa = MPa
 Mpa = MPa
 MPA = MPa
 
-GPa = giga * pascal
-GPa.label = 'GPa'
+GPa = (giga * pascal).with_label('GPa')
 gpa = GPa
 Gpa = GPa
 GPA = GPa
@@ -55,12 +51,10 @@ GPA = GPa
 
 # others
 
-bar = 1e5 * pascal
-bar.label = 'bar'
+bar = (1e5 * pascal).with_label('bar')
 bars = bar
 
-kilobar = kilo * bar
-kilobar.label = 'kbar'
+kilobar = (kilo * bar).with_label('kbar')
 kbar = kilobar
 kbars = kbar
 
@@ -71,11 +65,9 @@ atmosphere = 101325 * pascal
 
 atm = atmosphere
 
-pounds_per_square_inch = lbf / inch ** 2
-pounds_per_square_inch.label = 'psi'
+pounds_per_square_inch = (lbf / inch ** 2).with_label('psi')
 psi = pounds_per_square_inch
 apsi = psi
 psig = unit(psi.value, psi.derivation, 14.6959494)
 
-inHg = 3386.389 * pascal
-inHg.label = 'inHg'
+inHg = (3386.389 * pascal).with_label('inHg')
@@ -0,0 +1,243 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Snapshots of the unit registry, validated against their sources.
+
+Building the unit registry means importing the unit modules and parsing the
+unit data files (see scimath.units.unit_db).  The result can be saved as JSON
+in a cache directory, together with a fingerprint of the files it was built
+from, so that later processes load it with a single read.  A snapshot whose
+fingerprint does not match the current sources is ignored.
+
+Snapshots only hold plain data: the units are saved as their value,
+derivation, offset and label and rebuilt when the snapshot is loaded, so
+that loading a snapshot never runs code from the cache directory.
+
+The cache directory is, in order of preference, the directory named by the
+SCIMATH_CACHE_DIR environment variable, or a 'scimath' directory in the
+user's cache directory.  Setting SCIMATH_CACHE_DIR to an empty string
+disables the snapshots.
+
+Snapshots are only written on request, by running this module as a script::
+
+    python -m scimath.units.registry_cache
+
+or, for every load of the registry which does not use a snapshot, by setting
+the SCIMATH_WRITE_CACHE environment variable to a non-empty string.
+"""
+
+# Standard library imports.
+import logging
+import os
+import sys
+
+# Local imports.
+from scimath.units.smart_unit import SmartUnit
+from scimath.units.unit import unit
+
+logger = logging.getLogger(__name__)
+
+
+#: Bumped whenever the layout of the snapshots changes.
+SNAPSHOT_FORMAT = 3
+
+
+def cache_directory():
+    """ Returns the directory of the snapshots, or None if they are disabled.
+    """
+    directory = os.environ.get('SCIMATH_CACHE_DIR')
+    if directory is not None:
+        return directory or None
+
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser(os.path.join('~', 'Library', 'Caches'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or \
+            os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(base, 'scimath')
+
+
+def save_on_load():
+    """ Returns whether loading the registry saves its snapshots, as
+    requested through the SCIMATH_WRITE_CACHE environment variable.
+    """
+    return bool(os.environ.get('SCIMATH_WRITE_CACHE'))
+
+
+def source_fingerprint(paths):
+    """ Returns a fingerprint of the files a snapshot is built from.
+
+    The fingerprint changes when any of the files is modified, as well as
+    with the snapshot format and the version of Python.
+    """
+    fingerprint = [SNAPSHOT_FORMAT, list(sys.version_info[:2])]
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            state = None
+        else:
+            state = [stat.st_size, stat.st_mtime_ns]
+        fingerprint.append([os.path.abspath(path), state])
+    return fingerprint
+
+
+def load_snapshot(name, fingerprint):
+    """ Returns the data of the snapshot called name, or None if there is no
+    valid snapshot for the given fingerprint.
+    """
+    import json
+
+    path = _snapshot_path(name)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as snapshot:
+            content = snapshot.read()
+        saved_fingerprint, data = json.loads(content.decode('utf-8'))
+        if saved_fingerprint != fingerprint:
+            return None
+        return _decode(data)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.debug('Ignoring unreadable unit snapshot %s', path,
+                     exc_info=True)
+        return None
+
+
+def save_snapshot(name, fingerprint, data):
+    """ Saves data as the snapshot called name.
+
+    Failures to write the snapshot, e.g. in a read-only cache directory, are
+    logged and otherwise ignored.
+    """
+    import json
+    import tempfile
+
+    path = _snapshot_path(name)
+    if path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        content = json.dumps([fingerprint, _encode(data)]).encode('utf-8')
+        # Write atomically so that concurrent processes never read a
+        # partial snapshot.
+        handle, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=name, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as snapshot:
+                snapshot.write(content)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+    except Exception:
+        logger.debug('Could not save unit snapshot %s', path, exc_info=True)
+
+
+def _snapshot_path(name):
+    directory = cache_directory()
+    if directory is None:
+        return None
+    return os.path.join(directory, name + '.json')
+
+
+def _encode(data):
+    """ Returns data as JSON-compatible plain data.
+
+    The result is a pair of the table of the units in data and of data
+    itself, in which every JSON object has a single key telling what it
+    stands for: 'dict', 'tuple', or 'unit' (the index of a unit in the
+    table).
+    """
+    units = []
+    indices = {}
+
+    def encode(item):
+        if isinstance(item, (str, int, float)) or item is None:
+            return item
+        if isinstance(item, list):
+            return [encode(element) for element in item]
+        if isinstance(item, tuple):
+            return {'tuple': [encode(element) for element in item]}
+        if isinstance(item, dict):
+            if not all(isinstance(key, str) for key in item):
+                raise TypeError("snapshot dicts must have str keys")
+            return {'dict': dict((key, encode(value))
+                                 for key, value in item.items())}
+        if type(item) is unit:
+            fields = ['unit', item.value, list(item.derivation), item.offset,
+                      item.label]
+        elif type(item) is SmartUnit:
+            fields = ['SmartUnit', item.label, item.value,
+                      list(item.derivation), item.offset, item.valid]
+        else:
+            raise TypeError("cannot save %r in a snapshot" % (item,))
+        # Units are immutable, so each distinct unit is saved only once.
+        key = repr(fields)
+        if key not in indices:
+            indices[key] = len(units)
+            units.append(fields)
+        return {'unit': indices[key]}
+
+    encoded = encode(data)
+    return [units, encoded]
+
+
+def _decode(data):
+    """ Returns the data encoded by _encode().
+    """
+    unit_fields, encoded = data
+    units = []
+    for fields in unit_fields:
+        kind = fields[0]
+        # Labelled units are looked up in the interned units, e.g. those
+        # of the unit modules.
+        if kind == 'unit':
+            units.append(unit._intern(*fields[1:]))
+        elif kind == 'SmartUnit':
+            units.append(SmartUnit._intern(*fields[1:]))
+        else:
+            raise ValueError("unknown snapshot unit %r" % kind)
+
+    def decode(item):
+        if isinstance(item, list):
+            return [decode(element) for element in item]
+        if not isinstance(item, dict):
+            return item
+        (kind, content), = item.items()
+        if kind == 'dict':
+            return dict((key, decode(value))
+                        for key, value in content.items())
+        if kind == 'tuple':
+            return tuple(decode(element) for element in content)
+        if kind == 'unit':
+            return units[content]
+        raise ValueError("unknown snapshot item %r" % kind)
+
+    return decode(encoded)
+
+
+def build_snapshots():
+    """ Builds and saves the snapshots of the unit registry.
+    """
+    from scimath.units.unit_db import UnitDB
+    from scimath.units.unit_parser import Parser
+
+    parser = Parser()
+    parser.load(use_snapshot=False, save_snapshot=True)
+    UnitDB().load(use_snapshot=False, save_snapshot=True)
+
+
+if __name__ == '__main__':
+    build_snapshots()
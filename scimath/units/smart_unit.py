@@ -19,34 +19,20 @@ import numpy
 
 # Local imports.
 from scimath.units.convert import convert
-from scimath.units.SI import dimensionless
 
-from scimath.units.unit import unit
+from scimath.units.unit import _read_only, unit
 
 
 class OffsetUnit(unit):
     """ Special unit to handle temperatures as absolutes--including offsets """
 
-    def __init__(self, factor, derivation, offset=0.0):
-        warnings.warn("Using the OffsetUnit class is not recommended as its offset"
-                      " attribute is now available on the more general parent "
-                      "class: scimath.units.unit.unit.")
-        unit.__init__(self, factor, derivation)
-        self.offset = offset
+    __slots__ = ()
 
-    def __eq__(self, other):
-        """ return true if self and other are the same """
-        return (super(OffsetUnit, self).__eq__(other)
-                and hasattr(self, 'offset')
-                and hasattr(other, 'offset')
-                and (self.offset == other.offset))
-
-    def __ne__(self, other):
-        """ return true if self and other are not the same """
-        return (super(OffsetUnit, self).__ne__(other)
-                or (hasattr(self, 'offset')
-                    and hasattr(other, 'offset')
-                    and (self.offset != other.offset)))
+    def __init__(self, factor, derivation, offset=0.0, label=None):
+        warnings.warn("Using the OffsetUnit class is not recommended as its "
+                      "offset attribute is now available on the more general "
+                      "parent class: scimath.units.unit.unit.")
+        unit.__init__(self, factor, derivation, offset, label)
 
 
 class SmartUnit(OffsetUnit):
@@ -56,19 +42,16 @@ class SmartUnit(OffsetUnit):
     of '1000*kg*m**-3'.
     """
 
-    def __init__(self, label, value, derivation, offset, valid):
+    __slots__ = ('_valid',)
+
+    _fields = ('label', 'value', 'derivation', 'offset', 'valid')
+    _extra_fields = ('valid',)
 
-        self.label = label
-        self.value = value
-        self.derivation = derivation
-        self.offset = offset
-        self.valid = valid
+    valid = _read_only('valid', "Whether the unit was parsed successfully.")
 
-    def __eq__(self, other):
-        """ return true if self and other are the same """
-        return (super(OffsetUnit, self).__eq__(other)
-                and ((hasattr(other, 'offset') and self.offset == other.offset)
-                     or self.offset == 0))
+    def __init__(self, label, value, derivation, offset=0.0, valid=True):
+        self._valid = valid
+        unit.__init__(self, value, derivation, offset, label)
 
     def is_valid(self):
         return self.valid
@@ -112,7 +95,4 @@ class SmartUnit(OffsetUnit):
 def is_dimensionless(unit):
     """ Determines whether a unit is dimensionless, i.e., has no units.
     """
-    if unit.derivation == dimensionless.derivation:
-        return True
-
-    return False
+    return unit.is_dimensionless()
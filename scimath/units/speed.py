@@ -34,18 +34,12 @@ from .length import foot, kilometer, meter, nautical_mile, mile
 # Data taken from Appendix F of Halliday, Resnick, Walker,
 #     "Fundamentals of Physics", fourth edition, John Willey and Sons, 1993
 
-knot = nautical_mile / hour
-knot.label = 'knot'
-feet_per_second = foot / second
-feet_per_second.label = 'ft/s'
-meters_per_second = meter / second
-meters_per_second.label = 'm/s'
-meters_per_millisecond = meter / millisecond
-meters_per_millisecond.label = 'm/msec'
-kilometers_per_second = kilometer / second
-kilometers_per_second.label = 'km/s'
-miles_per_hour = mile / hour
-miles_per_hour.label = 'mph'
+knot = (nautical_mile / hour).with_label('knot')
+feet_per_second = (foot / second).with_label('ft/s')
+meters_per_second = (meter / second).with_label('m/s')
+meters_per_millisecond = (meter / millisecond).with_label('m/msec')
+kilometers_per_second = (kilometer / second).with_label('km/s')
+miles_per_hour = (mile / hour).with_label('mph')
 
 #############################################################################
 # Aliases:
@@ -20,6 +20,7 @@ converters.
 from traits.api import HasPrivateTraits, Dict
 
 # local imports
+from scimath.units.lazy_instance import LazyInstance
 from scimath.units.unit_db import UnitDB
 
 
@@ -43,11 +44,8 @@ class StyleManager(HasPrivateTraits):
     def __init__(self):
 
         udb = UnitDB()
-
-        udb.get_family_format_from_file()
+        udb.load()
         self.styles = udb.unit_formats
-
-        udb.get_family_ranges_from_file()
         self.ranges = udb.unit_ranges
 
     ###########################################################################
@@ -81,5 +79,17 @@ class StyleManager(HasPrivateTraits):
         return self.ranges[family_name][unit_system.name.lower()]
 
 
-# The as-yet unenforced singleton instance
-style_manager = StyleManager()
+# The as-yet unenforced singleton instance, created when first used, see
+# __getattr__().
+_style_manager = LazyInstance(StyleManager)
+
+
+def __getattr__(name):
+    """ Returns the style manager singleton as ``style_manager``, creating it
+        when the name is first looked up. """
+
+    if name == 'style_manager':
+        instance = _style_manager.get_instance()
+        globals()['style_manager'] = instance
+        return instance
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -28,13 +28,11 @@ from scimath.units.unit import unit
 # Tk = 5/9 * (Tr)
 # Tk = 5/9 * (Tf + 459.67)
 
-kelvin = unit(1.0, (0, 0, 0, 0, 1, 0, 0), 0.0)
-kelvin.label = 'kelvin'
-celsius = unit(1.0, (0, 0, 0, 0, 1, 0, 0), 273.15)
-celsius.label = 'celsius'
+kelvin = unit(1.0, (0, 0, 0, 0, 1, 0, 0), 0.0, label='kelvin')
+celsius = unit(1.0, (0, 0, 0, 0, 1, 0, 0), 273.15, label='celsius')
 rankine = unit(5.0 / 9.0, (0, 0, 0, 0, 1, 0, 0), 0.0)
-fahrenheit = unit(5.0 / 9.0, (0, 0, 0, 0, 1, 0, 0), 459.67)
-fahrenheit.label = 'fahrenheit'
+fahrenheit = unit(5.0 / 9.0, (0, 0, 0, 0, 1, 0, 0), 459.67,
+                  label='fahrenheit')
 
 # aliases
 K = kelvin
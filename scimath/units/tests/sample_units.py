@@ -9,8 +9,6 @@
 # Thanks for using Enthought open source!
 
 from scimath.units.length import mm
-from copy import copy
 
 
-custom_unit = copy(mm)
-custom_unit.label = "cuwl"
+custom_unit = mm.with_label("cuwl")
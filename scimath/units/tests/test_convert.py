@@ -0,0 +1,432 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Tests for the conversion functions in scimath.units.convert.
+"""
+
+from importlib import import_module
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy
+from numpy.testing import assert_array_almost_equal
+
+from scimath.units.convert import (
+    _BLOCK_SIZE, ConversionPlan, conversion_kind, conversion_plan_cache,
+    convert, convert_chunked, convert_many, get_conversion_plan,
+    make_converter, resolve_dtype
+)
+from scimath.units.geo_units import us_per_ft
+from scimath.units.length import feet, meter
+from scimath.units.time import second
+from scimath.units.lru_cache import LRUCache
+from scimath.units.temperature import celsius, fahrenheit
+from scimath.units.unit import InvalidConversion
+from scimath.units.unit_array import UnitArray
+from traits.testing.api import doctest_for_module
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.add('a', 1)
+        cache.add('b', 2)
+        cache.lookup('a')
+        cache.add('c', 3)
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.cache_info().evictions, 1)
+
+    def test_statistics(self):
+        cache = LRUCache(max_size=10)
+        cache.add('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        with self.assertRaises(KeyError):
+            cache.lookup('c')
+
+        info = cache.cache_info()
+        self.assertEqual((info.hits, info.misses, info.size), (1, 2, 1))
+
+        cache.clear()
+        self.assertEqual(cache.cache_info(), (0, 0, 0, 10, 0))
+
+    def test_shrinking_max_size_evicts(self):
+        cache = LRUCache(max_size=3)
+        for key in 'abc':
+            cache.add(key, key)
+        cache.max_size = 1
+
+        self.assertEqual(len(cache), 1)
+        self.assertIn('c', cache)
+
+
+class ConversionPlanTestCase(unittest.TestCase):
+
+    def setUp(self):
+        conversion_plan_cache.clear()
+
+    def test_plan_factor_and_offset(self):
+        plan = ConversionPlan(celsius, fahrenheit)
+        self.assertAlmostEqual(plan.factor, 1.8)
+        self.assertAlmostEqual(plan.offset, 32.0)
+        self.assertFalse(plan.inverted)
+        self.assertAlmostEqual(plan.apply(100.0), 212.0)
+
+    def test_identity_plan(self):
+        plan = ConversionPlan(meter, meter)
+        self.assertTrue(plan.identity)
+        value = numpy.arange(3.0)
+        self.assertIs(plan.apply(value), value)
+
+    def test_shared_plans_are_read_only(self):
+        to_meters = make_converter(feet, meter)
+        for name in ['from_unit', 'factor', 'offset', 'kind', 'identity']:
+            with self.assertRaises(AttributeError):
+                setattr(to_meters, name, 2.0)
+        self.assertAlmostEqual(convert(10.0, feet, meter), 3.048)
+
+    def test_plan_is_cached(self):
+        plan = get_conversion_plan(meter, feet)
+        self.assertIs(get_conversion_plan(meter, feet), plan)
+
+        info = conversion_plan_cache.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_convert_uses_cache(self):
+        for i in range(5):
+            result = convert(numpy.array([1.0, 2.0]), meter, feet)
+
+        assert_array_almost_equal(result, [3.2808399, 6.5616798])
+        self.assertEqual(conversion_plan_cache.cache_info().hits, 4)
+
+    def test_plan_kinds(self):
+        self.assertEqual(ConversionPlan(meter, meter).kind, 'identity')
+        self.assertEqual(ConversionPlan(meter, feet).kind, 'direct')
+        plan = get_conversion_plan(us_per_ft, feet / second)
+        self.assertEqual(plan.kind, 'reciprocal')
+        self.assertTrue(plan.inverted)
+        self.assertAlmostEqual(plan.factor, 1e6)
+        self.assertIs(get_conversion_plan(us_per_ft, feet / second), plan)
+
+    def test_reciprocal_conversion(self):
+        self.assertAlmostEqual(convert(100.0, us_per_ft, feet / second),
+                               10000.0)
+        self.assertAlmostEqual(convert(10000.0, feet / second, us_per_ft),
+                               100.0)
+        value = numpy.array([50.0, 200.0], dtype=numpy.float32)
+        result = convert(value, us_per_ft, feet / second, dtype='preserve')
+        self.assertEqual(result.dtype, numpy.float32)
+        assert_array_almost_equal(result, [20000.0, 5000.0])
+
+        convert(value, us_per_ft, feet / second, inplace=True)
+        assert_array_almost_equal(value, [20000.0, 5000.0])
+
+    def test_conversion_kind(self):
+        self.assertEqual(conversion_kind(meter, feet), 'direct')
+        self.assertEqual(conversion_kind(second, 1 / second), 'reciprocal')
+        self.assertIsNone(conversion_kind(meter, second))
+
+    def test_incompatible_units_not_cached(self):
+        with self.assertRaises(InvalidConversion):
+            convert(1.0, meter, celsius)
+        self.assertEqual(len(conversion_plan_cache), 0)
+
+
+class InplaceConvertTestCase(unittest.TestCase):
+
+    def test_inplace_array(self):
+        value = numpy.array([0.0, 100.0])
+        result = convert(value, celsius, fahrenheit, inplace=True)
+        self.assertIs(result, value)
+        assert_array_almost_equal(value, [32.0, 212.0])
+
+    def test_inplace_large_array_with_offset(self):
+        value = numpy.linspace(-40.0, 100.0, 3 * _BLOCK_SIZE + 7)
+        expected = value * 1.8 + 32.0
+
+        convert(value, celsius, fahrenheit, inplace=True)
+
+        assert_array_almost_equal(value, expected)
+
+    def test_inplace_non_contiguous(self):
+        base = numpy.zeros((4, 4))
+        value = base[:, 1]
+        value[:] = 100.0
+
+        convert(value, celsius, fahrenheit, inplace=True)
+
+        assert_array_almost_equal(base[:, 1], [212.0] * 4)
+        assert_array_almost_equal(base[:, 0], [0.0] * 4)
+
+    def test_inplace_identity(self):
+        value = numpy.array([1.0, 2.0])
+        self.assertIs(convert(value, meter, meter, inplace=True), value)
+        assert_array_almost_equal(value, [1.0, 2.0])
+
+    def test_inplace_scalar(self):
+        self.assertAlmostEqual(convert(100.0, celsius, fahrenheit,
+                                       inplace=True), 212.0)
+
+
+class UnitArrayConvertTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.value = UnitArray([0.0, 100.0], units=celsius)
+
+    def assert_converted(self, result):
+        self.assertIsInstance(result, UnitArray)
+        self.assertEqual(result.units, celsius)
+        assert_array_almost_equal(result, [32.0, 212.0])
+
+    def test_same_result_in_every_mode(self):
+        self.assert_converted(convert(self.value, celsius, fahrenheit))
+        for dtype in ['preserve', 'promote', numpy.float64]:
+            self.assert_converted(convert(self.value, celsius, fahrenheit,
+                                          dtype=dtype))
+        self.assert_converted(make_converter(celsius, fahrenheit)(self.value))
+        self.assert_converted(convert_many([self.value], celsius,
+                                           fahrenheit)[0])
+        assert_array_almost_equal(self.value, [0.0, 100.0])
+
+        result = convert(self.value, celsius, fahrenheit, inplace=True)
+        self.assertIs(result, self.value)
+        self.assert_converted(result)
+
+    def test_as_units(self):
+        for kwargs in [{}, {'dtype': 'promote'}, {'inplace': True}]:
+            value = UnitArray([0.0, 100.0], units=celsius)
+            result = value.as_units(fahrenheit, **kwargs)
+            self.assertEqual(result.units, fahrenheit)
+            assert_array_almost_equal(result, [32.0, 212.0])
+
+
+class DtypePolicyTestCase(unittest.TestCase):
+
+    def test_resolve_dtype(self):
+        float32 = numpy.zeros(1, dtype=numpy.float32)
+        int32 = numpy.zeros(1, dtype=numpy.int32)
+
+        self.assertIsNone(resolve_dtype(float32, None))
+        self.assertEqual(resolve_dtype(float32, 'preserve'), numpy.float32)
+        self.assertEqual(resolve_dtype(int32, 'preserve'), numpy.float64)
+        self.assertEqual(resolve_dtype(float32, 'promote'), numpy.float64)
+        self.assertEqual(resolve_dtype(1.0, 'promote'), numpy.float64)
+        self.assertEqual(resolve_dtype(float32, 'float16'), numpy.float16)
+
+    def test_preserve_float32(self):
+        value = numpy.array([0.0, 100.0], dtype=numpy.float32)
+        result = convert(value, celsius, fahrenheit, dtype='preserve')
+        self.assertEqual(result.dtype, numpy.float32)
+        assert_array_almost_equal(result, [32.0, 212.0], 4)
+
+    def test_preserve_integer(self):
+        value = numpy.array([1, 2])
+        result = convert(value, meter, feet, dtype='preserve')
+        self.assertEqual(result.dtype, numpy.float64)
+        assert_array_almost_equal(result, [3.2808399, 6.5616798])
+
+    def test_promote(self):
+        value = numpy.array([1.0], dtype=numpy.float32)
+        result = convert(value, meter, feet, dtype='promote')
+        self.assertEqual(result.dtype, numpy.float64)
+
+    def test_explicit_dtype_identity(self):
+        value = numpy.array([1.0, 2.0])
+        result = convert(value, meter, meter, dtype=numpy.float32)
+        self.assertEqual(result.dtype, numpy.float32)
+        self.assertIs(convert(value, meter, meter, dtype='preserve'), value)
+
+    def test_inplace_dtype_mismatch(self):
+        value = numpy.array([1.0], dtype=numpy.float32)
+        with self.assertRaises(ValueError) as context:
+            convert(value, meter, feet, inplace=True, dtype='promote')
+        self.assertIn('float64', str(context.exception))
+
+    def test_inplace_integer_array(self):
+        value = numpy.array([1, 2])
+        with self.assertRaises(ValueError) as context:
+            convert(value, meter, feet, inplace=True)
+        self.assertIn('float64', str(context.exception))
+        self.assertEqual(value.tolist(), [1, 2])
+        self.assertIs(convert(value, meter, meter, inplace=True), value)
+
+
+class MakeConverterTestCase(unittest.TestCase):
+
+    def test_scalar(self):
+        to_fahrenheit = make_converter(celsius, fahrenheit)
+        self.assertAlmostEqual(to_fahrenheit(100.0), 212.0)
+        self.assertAlmostEqual(to_fahrenheit(0.0), 32.0)
+
+    def test_incompatible_units_fail_early(self):
+        with self.assertRaises(InvalidConversion):
+            make_converter(meter, celsius)
+
+    def test_out(self):
+        to_feet = make_converter(meter, feet)
+        value = numpy.array([1.0, 2.0])
+        out = numpy.empty(2)
+
+        result = to_feet(value, out=out)
+
+        self.assertIs(result, out)
+        assert_array_almost_equal(out, [3.2808399, 6.5616798])
+        assert_array_almost_equal(value, [1.0, 2.0])
+
+    def test_out_is_input(self):
+        to_fahrenheit = make_converter(celsius, fahrenheit)
+        value = numpy.array([0.0, 100.0])
+
+        result = to_fahrenheit(value, out=value)
+
+        self.assertIs(result, value)
+        assert_array_almost_equal(value, [32.0, 212.0])
+
+    def test_dtype(self):
+        to_feet = make_converter(meter, feet)
+        result = to_feet(numpy.arange(3, dtype=numpy.float32),
+                         dtype=numpy.float64)
+        self.assertEqual(result.dtype, numpy.float64)
+
+    def test_identity_with_out(self):
+        to_meter = make_converter(meter, meter)
+        value = numpy.array([1.0, 2.0])
+        out = numpy.empty(2)
+
+        self.assertIs(to_meter(value, out=out), out)
+        assert_array_almost_equal(out, value)
+
+
+class ConvertManyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        conversion_plan_cache.clear()
+
+    def test_heterogeneous_units(self):
+        values = [numpy.array([1.0, 2.0]), numpy.array([0.0, 100.0]), 3.0]
+        results = convert_many(values, [meter, celsius, meter],
+                               [feet, fahrenheit, feet])
+
+        assert_array_almost_equal(results[0], [3.2808399, 6.5616798])
+        assert_array_almost_equal(results[1], [32.0, 212.0])
+        self.assertAlmostEqual(results[2], 9.8425197)
+        # One plan per distinct pair of units.
+        self.assertEqual(conversion_plan_cache.cache_info().misses, 2)
+
+    def test_shared_units_and_out(self):
+        values = [numpy.arange(3.0), numpy.arange(2.0)]
+        out = [numpy.empty(3), numpy.empty(2)]
+
+        results = convert_many(values, meter, feet, out=out)
+
+        self.assertIs(results[0], out[0])
+        assert_array_almost_equal(out[1], [0.0, 3.2808399])
+        assert_array_almost_equal(values[1], [0.0, 1.0])
+
+    def test_inplace_with_threads(self):
+        values = [numpy.full(1000, float(i)) for i in range(8)]
+
+        results = convert_many(values, celsius, fahrenheit, inplace=True,
+                               max_workers=4)
+
+        for i, (value, result) in enumerate(zip(values, results)):
+            self.assertIs(result, value)
+            assert_array_almost_equal(value, numpy.full(1000, 32 + 1.8 * i))
+
+    def test_incompatible_units(self):
+        value = numpy.array([1.0])
+        with self.assertRaises(InvalidConversion):
+            convert_many([value, value], [meter, meter], [feet, celsius],
+                         inplace=True)
+        assert_array_almost_equal(value, [1.0])
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            convert_many([1.0, 2.0], [meter], feet)
+
+
+class ConvertChunkedTestCase(unittest.TestCase):
+
+    def test_memmap_to_memmap(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = numpy.memmap(os.path.join(directory, 'source.dat'),
+                                  dtype=numpy.float32, mode='w+',
+                                  shape=(10, 7))
+            source[:] = numpy.arange(70).reshape(10, 7)
+            destination = numpy.memmap(
+                os.path.join(directory, 'destination.dat'),
+                dtype=numpy.float32, mode='w+', shape=(10, 7))
+
+            result = convert_chunked(source, celsius, fahrenheit,
+                                     out=destination, chunk_size=8)
+
+            self.assertIs(result, destination)
+            assert_array_almost_equal(
+                destination, numpy.arange(70).reshape(10, 7) * 1.8 + 32, 4)
+            del source, destination, result
+
+    def test_non_contiguous_input(self):
+        value = numpy.arange(24.0).reshape(4, 6)[:, ::2]
+
+        result = convert_chunked(value, meter, feet, chunk_size=5)
+
+        assert_array_almost_equal(result, value * 3.2808399)
+
+    def test_fortran_ordered_array_in_storage_order(self):
+        value = numpy.asfortranarray(numpy.arange(24.0).reshape(4, 6))
+        blocks = []
+        call = ConversionPlan.__call__
+
+        def record_block(plan, block, out=None, dtype=None):
+            blocks.append(block)
+            return call(plan, block, out=out, dtype=dtype)
+
+        with mock.patch.object(ConversionPlan, '__call__', record_block):
+            result = convert_chunked(value, meter, feet, chunk_size=5)
+
+        self.assertEqual(len(blocks), 5)
+        self.assertTrue(all(block.flags.c_contiguous for block in blocks))
+        self.assertTrue(result.flags.f_contiguous)
+        assert_array_almost_equal(result, value * 3.2808399)
+
+    def test_unit_array_keeps_its_units(self):
+        value = UnitArray(numpy.arange(10.0), units=meter)
+        result = convert_chunked(value, meter, feet, chunk_size=3)
+        self.assertIsInstance(result, UnitArray)
+        self.assertEqual(result.units, meter)
+        assert_array_almost_equal(result.view(numpy.ndarray),
+                                  numpy.arange(10.0) * 3.2808399)
+
+    def test_inplace_and_dtype(self):
+        value = numpy.arange(10.0)
+        self.assertIs(convert_chunked(value, celsius, fahrenheit, out=value,
+                                      chunk_size=3), value)
+        assert_array_almost_equal(value, numpy.arange(10.0) * 1.8 + 32)
+
+        result = convert_chunked(numpy.arange(3), meter, meter,
+                                 dtype='preserve')
+        self.assertEqual(result.dtype, numpy.float64)
+
+    def test_shape_mismatch(self):
+        with self.assertRaises(ValueError):
+            convert_chunked(numpy.arange(3.0), meter, feet,
+                            out=numpy.empty(4))
+
+
+# 'scimath.units.convert' is shadowed by the convert() function in the package
+# namespace, so fetch the module itself.
+class ConvertDocTestCase(
+        doctest_for_module(import_module('scimath.units.convert'))):
+    pass
@@ -75,6 +75,23 @@ class HasUnitsTestCase(unittest.TestCase):
 
         self.assertEqual(func(1), func_wrapped(1))
 
+    def test_input_dtype_policy(self):
+        """ Are float32 inputs kept in float32 with dtype='preserve'?
+
+        """
+        def func(value):
+            return value
+
+        func_wrapped = has_units(inputs="value: a value: units=ft;",
+                                 dtype='preserve')(func)
+        value = UnitArray(numpy.array([1.0, 2.0], dtype=numpy.float32),
+                          units=meters)
+
+        result = func_wrapped(value)
+
+        self.assertTrue(result.dtype == numpy.float32)
+        assert_array_almost_equal(result, [3.2808399, 6.5616798], 5)
+
     def test_wrapped_with_output_units(self):
         """ Does wrapped function with outputs behave like non-wrapped function?
 
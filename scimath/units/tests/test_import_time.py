@@ -0,0 +1,131 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Tests that importing scimath.units stays cheap.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from scimath.units.lazy_instance import LazyInstance
+
+
+# Run in a fresh interpreter, without unit snapshots.  The third-party
+# dependencies are imported first so that only our own work is recorded.
+IMPORT_SCRIPT = """
+import json
+import sys
+
+import numpy
+import traits.api
+
+imported = set(sys.modules)
+opened = []
+
+
+def record_open(event, args):
+    if event == 'open' and isinstance(args[0], str):
+        opened.append(args[0])
+
+
+sys.addaudithook(record_open)
+
+import scimath.units
+
+from scimath.units.unit_parser import unit_parser
+
+unit_manager_module = sys.modules['scimath.units.unit_manager']
+
+print(json.dumps({
+    'modules': sorted(name for name in sys.modules
+                      if name.startswith('scimath') and name not in imported),
+    'opened': [path for path in opened
+               if not path.endswith(('.py', '.pyc', '.so', '.pyd'))],
+    'unit_manager_created': unit_manager_module._unit_manager.created,
+    'parser_loaded': unit_parser.parser.loaded,
+}))
+"""
+
+#: The modules imported by scimath.units.  Of the unit modules, only SI is
+#: imported, for the units the others are derived from; the remaining unit
+#: modules, the unit data files and the style_manager are only loaded when
+#: first used.
+IMPORTED_MODULES = [
+    'scimath',
+    'scimath._version',
+    'scimath.units',
+    'scimath.units.SI',
+    'scimath.units.convert',
+    'scimath.units.lazy_instance',
+    'scimath.units.lru_cache',
+    'scimath.units.registry_cache',
+    'scimath.units.smart_unit',
+    'scimath.units.unit',
+    'scimath.units.unit_converter',
+    'scimath.units.unit_db',
+    'scimath.units.unit_expression',
+    'scimath.units.unit_manager',
+    'scimath.units.unit_module_index',
+    'scimath.units.unit_parser',
+    'scimath.units.unit_system',
+]
+
+
+class ImportTimeTestCase(unittest.TestCase):
+
+    def import_units(self):
+        env = dict(os.environ, SCIMATH_CACHE_DIR='')
+        output = subprocess.check_output(
+            [sys.executable, '-c', IMPORT_SCRIPT], env=env)
+        return json.loads(output.decode('utf-8').splitlines()[-1])
+
+    def test_import_does_no_work(self):
+        result = self.import_units()
+        self.assertEqual(result['modules'], IMPORTED_MODULES)
+        self.assertEqual(result['opened'], [])
+        self.assertFalse(result['unit_manager_created'])
+        self.assertFalse(result['parser_loaded'])
+
+
+class LazyInstanceTestCase(unittest.TestCase):
+
+    def test_created_on_first_access(self):
+        factory = mock.Mock(return_value=mock.Mock(spec=['name']))
+        lazy = LazyInstance(factory)
+        self.assertFalse(lazy.created)
+        self.assertFalse(factory.called)
+
+        lazy.name = 'metric'
+        self.assertEqual(lazy.name, 'metric')
+        self.assertIs(lazy.get_instance(), factory.return_value)
+        self.assertEqual(factory.call_count, 1)
+        self.assertTrue(lazy.created)
+
+    def test_factory_using_the_object_fails(self):
+        lazy = LazyInstance(lambda: lazy.get_instance())
+        with self.assertRaises(RuntimeError):
+            lazy.get_instance()
+        self.assertFalse(lazy.created)
+
+
+class SingletonTestCase(unittest.TestCase):
+
+    def test_singletons_are_the_objects_themselves(self):
+        import scimath.units
+        from scimath.units.style_manager import StyleManager, style_manager
+        from scimath.units.unit_manager import UnitManager, unit_manager
+
+        self.assertIsInstance(unit_manager, UnitManager)
+        self.assertIsInstance(style_manager, StyleManager)
+        self.assertIs(scimath.units.unit_manager, unit_manager)
@@ -8,7 +8,6 @@
 #
 # Thanks for using Enthought open source!
 
-from copy import copy
 import unittest
 
 from traits.testing.api import doctest_for_module
@@ -46,8 +45,7 @@ class UnitScalarTest(unittest.TestCase):
         self.assertEqual(repr(a), "UnitScalar(1, units='1e-05*m*kg')")
 
         # dimensionless quantity
-        dimensionless_unit = copy(dimensionless)
-        dimensionless_unit.label = "Cool unit"
+        dimensionless_unit = dimensionless.with_label("Cool unit")
         a = UnitScalar(1, units=dimensionless_unit)
         self.assertEqual(repr(a), "UnitScalar(1, units='1')")
 
@@ -63,7 +61,6 @@ class UnitScalarTest(unittest.TestCase):
         self.assertEqual(str(a), "UnitScalar (1e-05*m*kg): 1")
 
         # dimensionless quantity
-        dimensionless_unit = copy(dimensionless)
-        dimensionless_unit.label = "Cool unit"
+        dimensionless_unit = dimensionless.with_label("Cool unit")
         a = UnitScalar(1, units=dimensionless_unit)
         self.assertEqual(str(a), "UnitScalar (Cool unit): 1")
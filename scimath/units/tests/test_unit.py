@@ -8,10 +8,31 @@
 #
 # Thanks for using Enthought open source!
 
+from copy import copy, deepcopy
+import pickle
 import unittest
+import warnings
 
-from scimath.units.length import centimeter, meter
-from scimath.units.unit import unit
+import numpy
+
+from scimath.units.length import centimeter, feet, meter
+from scimath.units.smart_unit import OffsetUnit, SmartUnit
+from scimath.units.time import second
+from scimath.units.unit import IncompatibleUnits, unit, unit_algebra_cache
+
+
+def legacy_pickle(cls, state):
+    """ Returns a pickle of a unit of class cls, as saved when units had a
+    __dict__.
+    """
+    # Protocol 2 calls cls.__new__(cls) and then sets the state.
+    return b''.join([
+        pickle.PROTO, b'\x02',
+        pickle.GLOBAL, ('%s\n%s\n' % (cls.__module__, cls.__name__)).encode(),
+        pickle.EMPTY_TUPLE, pickle.NEWOBJ,
+        pickle.dumps(state, protocol=2)[2:-1],
+        pickle.BUILD, pickle.STOP,
+    ])
 
 
 class TestUnit(unittest.TestCase):
@@ -28,3 +49,172 @@ class TestUnit(unittest.TestCase):
         metre = unit(1.0, (1, 0, 0, 0, 0, 0, 0))
         self.assertEqual(meter, metre)
         self.assertEqual(hash(meter), hash(metre))
+
+    def test_units_are_interned(self):
+        first = unit(2.0, (1, 0, 0, 0, 0, 0, 0), label='two meters')
+        self.assertIs((2.0 * meter).with_label('two meters'), first)
+        self.assertIs(unit._intern(2.0, [1, 0, 0, 0, 0, 0, 0], 0.0,
+                                   'two meters'), first)
+        self.assertIs(pickle.loads(pickle.dumps(first)), first)
+
+        # Constructing a unit always creates a new one.
+        second = unit(2.0, (1, 0, 0, 0, 0, 0, 0), label='two meters')
+        self.assertIsNot(second, first)
+        self.assertEqual(second, first)
+        self.assertIs(second.with_label('two meters'), first)
+
+    def test_unlabelled_units_are_not_interned(self):
+        first = unit(2.0, (1, 0, 0, 0, 0, 0, 0))
+        second = 2.0 * meter
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertIsNone(second.label)
+
+    def test_label_is_part_of_identity(self):
+        labelled = meter.with_label('metre')
+        self.assertIsNot(labelled, meter)
+        self.assertEqual(labelled, meter)
+        self.assertEqual(labelled.label, 'metre')
+        self.assertIs(labelled.with_label('metre'), labelled)
+
+    def test_value_type_is_part_of_identity(self):
+        self.assertEqual(repr(unit(1, (1, 0, 0, 0, 0, 0, 0))), '1*m')
+        self.assertEqual(repr(unit(1.0, (1, 0, 0, 0, 0, 0, 0))), '1.0*m')
+
+    def test_units_are_immutable(self):
+        with self.assertRaises(AttributeError):
+            feet.label = 'foot'
+        with self.assertRaises(AttributeError):
+            feet.value = 1.0
+        with self.assertRaises(AttributeError):
+            feet.extra = 1.0
+        with self.assertRaises(AttributeError):
+            del feet.offset
+        self.assertEqual(feet.label, 'feet')
+
+    def test_copy_returns_same_unit(self):
+        self.assertIs(copy(feet), feet)
+        self.assertIs(deepcopy(feet), feet)
+
+    def test_pickle_preserves_identity(self):
+        self.assertIs(pickle.loads(pickle.dumps(feet)), feet)
+        smart = SmartUnit._intern('ft', feet.value, feet.derivation, 0.0, True)
+        self.assertIs(pickle.loads(pickle.dumps(smart)), smart)
+
+    def test_unpickle_legacy_units(self):
+        # Units pickled before they were immutable are rebuilt from their
+        # __dict__, after calling __new__ without arguments.
+        state = {'value': feet.value, 'derivation': list(feet.derivation),
+                 'label': 'ft'}
+        restored = pickle.loads(legacy_pickle(unit, state))
+        self.assertEqual(restored, feet)
+        self.assertEqual((restored.offset, restored.label), (0.0, 'ft'))
+
+        state['valid'] = False
+        restored = pickle.loads(legacy_pickle(SmartUnit, state))
+        self.assertEqual(restored, feet)
+        self.assertFalse(restored.valid)
+
+    def test_missing_derivation(self):
+        with self.assertRaises(TypeError):
+            unit(1.0)
+        with self.assertRaises(TypeError):
+            unit(1.0, None)
+        with self.assertRaises(TypeError):
+            SmartUnit('ft', feet.value)
+
+    def test_smart_unit_is_hashable(self):
+        smart = SmartUnit._intern('ft', feet.value, feet.derivation, 0.0, True)
+        self.assertEqual({smart: 1}[feet], 1)
+        self.assertIs(smart.with_label('ft'), smart)
+        self.assertIsNot(SmartUnit('ft', feet.value, feet.derivation, 0.0,
+                                   False), smart)
+
+    def test_offset_unit(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            degc = OffsetUnit(1.0, (0, 0, 0, 0, 1, 0, 0), 273.15)
+        self.assertEqual(len(caught), 1)
+        self.assertEqual(degc.offset, 273.15)
+        self.assertIsInstance(degc, OffsetUnit)
+
+    def test_array_valued_units_are_not_interned(self):
+        first = unit(numpy.arange(2.0), meter.derivation)
+        second = unit(numpy.arange(2.0), meter.derivation)
+        self.assertIsNot(first, second)
+
+    def test_arithmetic_derivations(self):
+        area = meter ** 2
+        self.assertEqual(area.derivation, (2, 0, 0, 0, 0, 0, 0))
+        self.assertEqual((area / meter ** 5).derivation,
+                         (-3, 0, 0, 0, 0, 0, 0))
+        self.assertEqual((~area).derivation, (-2, 0, 0, 0, 0, 0, 0))
+        self.assertEqual((1 / area).derivation, (-2, 0, 0, 0, 0, 0, 0))
+        self.assertEqual(area / meter, meter)
+        self.assertEqual(area / area, 1.0)
+        self.assertIsInstance(meter * (1 / meter), float)
+        self.assertTrue((meter ** 0).is_dimensionless())
+
+    def test_packed_and_tuple_derivations_compare_equal(self):
+        square_meter = unit(1.0, (2.0, 0, 0, 0, 0, 0, 0))
+        self.assertEqual(meter * meter, square_meter)
+        self.assertEqual(hash(meter ** 2), hash(square_meter))
+        self.assertEqual((meter ** 0.5).derivation,
+                         (0.5, 0, 0, 0, 0, 0, 0))
+        self.assertEqual((meter ** 0.5) ** 2, meter)
+
+    def test_derivation_tuples_are_packed_when_needed(self):
+        derivation = (3, 0, -1, 0, 0, 0, 0)
+        fresh = unit(2.0, derivation)
+        self.assertIsNone(fresh._dims)
+        self.assertEqual((fresh * second).derivation, (3, 0, 0, 0, 0, 0, 0))
+        self.assertIsNotNone(fresh._dims)
+        self.assertEqual(hash(fresh), hash(2.0 * meter ** 3 / second))
+        self.assertIs(unit(2.0, derivation).derivation, derivation)
+
+    def test_large_exponents_fall_back_to_tuples(self):
+        big = meter ** 20000
+        self.assertEqual(big.derivation, (20000, 0, 0, 0, 0, 0, 0))
+        self.assertEqual((big * big).derivation, (40000, 0, 0, 0, 0, 0, 0))
+        self.assertEqual((~big).derivation, (-20000, 0, 0, 0, 0, 0, 0))
+        self.assertEqual((meter ** 10000 * meter ** 10000).derivation,
+                         (20000, 0, 0, 0, 0, 0, 0))
+        self.assertEqual(((meter / feet.value) ** -10000).derivation[0],
+                         -10000)
+
+    def test_add_incompatible_units(self):
+        self.assertRaises(IncompatibleUnits, meter.__add__, meter ** 2)
+        self.assertEqual(meter + centimeter, unit(1.01, meter.derivation))
+
+    def test_unit_algebra_is_memoized(self):
+        unit_algebra_cache.clear()
+        speed = meter / second
+        self.assertIs(meter / second, speed)
+        self.assertIs(meter ** 2, meter ** 2)
+        self.assertIs(speed * second, speed * second)
+        info = unit_algebra_cache.cache_info()
+        self.assertEqual(info.misses, 3)
+        self.assertEqual(info.hits, 3)
+        self.assertEqual(meter ** 2, meter ** 2.0)
+
+    def test_unit_algebra_memo_is_bounded(self):
+        unit_algebra_cache.clear()
+        max_size = unit_algebra_cache.max_size
+        unit_algebra_cache.max_size = 2
+        try:
+            for power in range(1, 6):
+                meter ** power
+            info = unit_algebra_cache.cache_info()
+        finally:
+            unit_algebra_cache.max_size = max_size
+        self.assertEqual(info.misses, 5)
+        self.assertEqual(info.evictions, 4)
+        self.assertEqual(info.size, 1)
+
+    def test_array_valued_units_are_not_memoized(self):
+        unit_algebra_cache.clear()
+        lengths = unit(numpy.arange(1.0, 3.0), meter.derivation)
+        area = lengths * meter
+        numpy.testing.assert_array_equal(area.value, [1.0, 2.0])
+        self.assertEqual(len(unit_algebra_cache), 0)
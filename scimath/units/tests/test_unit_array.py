@@ -9,7 +9,6 @@
 # Thanks for using Enthought open source!
 
 # Standard library imports
-from copy import copy
 from pickle import dumps, loads
 import timeit
 import unittest
@@ -65,8 +64,7 @@ class UnitArrayTestCase(unittest.TestCase):
         self.assertEqual(repr(a), "UnitArray([1, 2, 3], units='1e-05*m*kg')")
 
         # dimensionless quantity
-        dimensionless_unit = copy(dimensionless)
-        dimensionless_unit.label = "Cool unit"
+        dimensionless_unit = dimensionless.with_label("Cool unit")
         a = UnitArray([1, 2, 3], units=dimensionless_unit)
         self.assertEqual(repr(a), "UnitArray([1, 2, 3], units='1')")
 
@@ -82,8 +80,7 @@ class UnitArrayTestCase(unittest.TestCase):
         self.assertEqual(str(a), "UnitArray (1e-05*m*kg): [1, 2, 3]")
 
         # dimensionless quantity
-        dimensionless_unit = copy(dimensionless)
-        dimensionless_unit.label = "Cool unit"
+        dimensionless_unit = dimensionless.with_label("Cool unit")
         a = UnitArray([1, 2, 3], units=dimensionless_unit)
         self.assertEqual(str(a), "UnitArray (Cool unit): [1, 2, 3]")
 
@@ -149,6 +146,35 @@ class UnitArrayTestCase(unittest.TestCase):
         # fixme: We should also test that any other items in the unit_ary are
         #        copied.
 
+    def test_as_units_inplace(self):
+        """ In-place conversion overwrites the data and the units.
+        """
+        unit_ary = UnitArray(numpy.array((1., 2., 3.)), units=meters)
+        data = unit_ary.view(numpy.ndarray)
+
+        result = unit_ary.as_units(feet, inplace=True)
+
+        self.assertIs(result, unit_ary)
+        self.assertEqual(result.units, feet)
+        assert_array_equal(data, units.convert(array((1., 2., 3.)), meters,
+                                               feet))
+
+    def test_as_units_preserve_dtype(self):
+        """ Conversion can keep single precision data in single precision.
+        """
+        unit_ary = UnitArray(numpy.array((1., 2., 3.), dtype=numpy.float32),
+                             units=meters)
+        result = unit_ary.as_units(feet, dtype='preserve')
+        self.assertEqual(result.dtype, numpy.float32)
+        self.assertEqual(result.units, feet)
+
+    def test_as_units_inplace_integer_fails(self):
+        """ In-place conversion cannot store floats in an integer array.
+        """
+        unit_ary = UnitArray(numpy.array((1, 2, 3)), units=meters)
+        self.assertRaises(ValueError, unit_ary.as_units, feet, inplace=True)
+        self.assertEqual(unit_ary.units, meters)
+
     ##########################################################################
     # Test cloning type behavior.
     ##########################################################################
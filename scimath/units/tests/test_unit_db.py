@@ -0,0 +1,96 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Tests for the UnitDB.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from scimath.units.density import grams_per_cubic_centimeter
+from scimath.units.tests import sample_units
+from scimath.units.unit_db import UnitDB
+from scimath.units.unit_parser import unit_parser
+
+
+class UnitDBLoadTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch.dict(os.environ,
+                                  {'SCIMATH_CACHE_DIR': self.directory})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Restored by the patcher.
+        os.environ.pop('SCIMATH_WRITE_CACHE', None)
+
+    def load(self, save_snapshot=True):
+        udb = UnitDB()
+        with mock.patch.object(UnitDB, 'get_unit_families_from_file',
+                               wraps=udb.get_unit_families_from_file) as read:
+            udb.load(save_snapshot=save_snapshot)
+        return udb, read.called
+
+    def test_load_fills_all_the_tables(self):
+        expected = UnitDB()
+        expected.get_family_members_from_file()
+        expected.get_unit_families_from_file()
+        expected.get_family_format_from_file()
+        expected.get_family_ranges_from_file()
+
+        udb, read = self.load()
+        self.assertTrue(read)
+        for name in UnitDB.tables:
+            self.assertEqual(getattr(udb, name), getattr(expected, name))
+            self.assertTrue(getattr(udb, name), name)
+
+    def test_snapshot_is_saved_and_loaded(self):
+        expected, read = self.load()
+        self.assertTrue(os.path.exists(
+            os.path.join(self.directory, 'unit_db.json')))
+
+        udb, read = self.load()
+        self.assertFalse(read)
+        for name in UnitDB.tables:
+            self.assertEqual(getattr(udb, name), getattr(expected, name))
+        self.assertEqual(udb.get_family_name('dt'), 'psonic')
+
+        column = udb.column_names['KGS_UNITS']
+        density = udb.unit_names['density'][column]
+        self.assertEqual(density, grams_per_cubic_centimeter)
+        self.assertEqual((density.label, density.valid), ('g/cc', True))
+
+    def test_snapshot_is_only_saved_on_request(self):
+        path = os.path.join(self.directory, 'unit_db.json')
+        self.load(save_snapshot=None)
+        self.assertFalse(os.path.exists(path))
+
+        with mock.patch.dict(os.environ, {'SCIMATH_WRITE_CACHE': '1'}):
+            self.load(save_snapshot=None)
+        self.assertTrue(os.path.exists(path))
+        self.assertFalse(self.load(save_snapshot=None)[1])
+
+    def test_snapshot_is_rebuilt_when_sources_change(self):
+        self.load()
+        with mock.patch.object(UnitDB, '_sourceFingerprint',
+                               return_value='changed'):
+            self.assertTrue(self.load()[1])
+            self.assertFalse(self.load()[1])
+
+    def test_snapshot_is_not_used_when_the_parser_is_extended(self):
+        self.load()
+        self.addCleanup(unit_parser.parser.init)
+        unit_parser.parser.extend(sample_units)
+        self.assertTrue(self.load()[1])
+        self.assertTrue(self.load()[1])
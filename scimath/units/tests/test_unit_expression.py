@@ -0,0 +1,89 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Tests for the compiled unit expressions.
+"""
+
+import unittest
+
+from scimath.units.length import foot, meter
+from scimath.units.mass import kilogram
+from scimath.units.time import second
+from scimath.units.unit_expression import (
+    UnitExpressionError, compile_unit_expression, expression_cache
+)
+from scimath.units.unit_parser import unit_parser
+
+
+CONTEXT = {'m': meter, 'ft': foot, 'kg': kilogram, 's': second}
+
+
+def evaluate(string):
+    return compile_unit_expression(string).evaluate(CONTEXT)
+
+
+class UnitExpressionTestCase(unittest.TestCase):
+
+    def test_matches_python_semantics(self):
+        expressions = [
+            'm', 'kg*m/s**2', 'm**-3', '-m**2', 'm**2**2', '2**-1',
+            '1000*kg/m**3', '1e3*m', '.5*ft', '(m + ft) / 2', 'kg/(m*s)',
+            '~s', '+ m - ft', ' m / s ',
+        ]
+        for expression in expressions:
+            self.assertEqual(evaluate(expression), eval(expression, CONTEXT),
+                             expression)
+
+    def test_numbers_keep_their_type(self):
+        self.assertIs(type(evaluate('1000')), int)
+        self.assertIs(type(evaluate('1000.')), float)
+
+    def test_invalid_expressions(self):
+        for expression in ['', 'm*', 'm)', '(m', '100ft', 'm^2', 'm.s',
+                           '__import__("os")', 'm(1)', 'm[0]', 'lambda: m']:
+            with self.assertRaises(UnitExpressionError, msg=expression):
+                compile_unit_expression(expression)
+
+    def test_numbers_are_computed_when_compiling(self):
+        self.assertEqual(compile_unit_expression('1000*2**-1').program,
+                         ((1, 500.0),))
+        self.assertEqual(evaluate('m*2**10'), meter * 1024)
+        with self.assertRaises(UnitExpressionError):
+            compile_unit_expression('1/(1-1)')
+
+    def test_large_integer_powers(self):
+        for expression in ['m*2**2**2**25', '2**-2**2**2**25', '10**10**10']:
+            with self.assertRaises(UnitExpressionError, msg=expression):
+                compile_unit_expression(expression)
+        with self.assertRaises(UnitExpressionError):
+            compile_unit_expression('n**n**n**n').evaluate({'n': 100})
+        self.assertFalse(unit_parser.parse_unit("m*2**2**2**25").valid)
+
+    def test_unknown_names(self):
+        with self.assertRaises(NameError):
+            evaluate('m*furlong')
+
+    def test_expressions_are_cached(self):
+        expression_cache.clear()
+        compiled = compile_unit_expression('m/s')
+        self.assertIs(compile_unit_expression('m/s'), compiled)
+        self.assertEqual(compiled.names, frozenset(['m', 's']))
+        with self.assertRaises(UnitExpressionError):
+            compile_unit_expression('m/')
+        with self.assertRaises(UnitExpressionError):
+            compile_unit_expression('m/')
+        self.assertEqual(expression_cache.cache_info().hits, 2)
+
+    def test_parser_falls_back_to_exact_labels(self):
+        parser = unit_parser.parser
+        self.assertEqual(parser.parse('ft/s^2'), foot / second ** 2)
+        self.assertEqual(parser.parse('MPa/100ft').label, 'MPa/100ft')
+        with self.assertRaises(UnitExpressionError):
+            parser.parse('__import__("os").getcwd()')
@@ -0,0 +1,281 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Tests for the UnitManager.
+"""
+
+from fnmatch import fnmatch
+import unittest
+from unittest import mock
+
+from scimath.units.length import foot
+from scimath.units.tests import sample_units
+from scimath.units.time import second
+from scimath.units.unit_manager import UnitManager
+from scimath.units.unit_parser import unit_parser
+from scimath.units.unit_system import UnitSystem
+
+
+# A unit which is in no family.
+furlong_per_second = (660 * foot / second).with_label('furlong/s')
+
+
+def copy_first_system(unit_manager, name):
+    """ Returns a new unit system of unit_manager, with the families of its
+    first unit system, for the tests to add to.
+    """
+    unit_system = UnitSystem(name)
+    unit_system.unit_manager = unit_manager
+    for family_name, family_unit in \
+            unit_manager.unit_systems[0].families.items():
+        unit_system.add_family(family_name, family_unit)
+    return unit_system
+
+
+class FamilyCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.unit_manager = UnitManager(family_cache_size=2)
+
+    def test_oldest_name_is_evicted(self):
+        get_family_name = self.unit_manager.get_family_name
+        self.assertEqual(get_family_name('svelo'), 'svelocity')
+        self.assertEqual(get_family_name('vpsand'), 'pvelocity')
+        get_family_name('svelo')
+        get_family_name('den')
+        # 'svelo' was the oldest name, although it was just used.
+        get_family_name('vpsand')
+        get_family_name('svelo')
+
+        info = self.unit_manager.family_cache_info()
+        self.assertEqual((info.hits, info.misses, info.evictions),
+                         (2, 4, 2))
+        self.assertEqual((info.max_size, info.size), (2, 2))
+
+    def test_cache_size(self):
+        self.unit_manager.family_cache_size = 1
+        for name in ['svelo', 'vpsand', 'svelo']:
+            self.unit_manager.get_family_name(name)
+        info = self.unit_manager.family_cache_info()
+        self.assertEqual((info.hits, info.max_size, info.size), (0, 1, 1))
+
+    def test_prefixed_names_are_cached(self):
+        get_family_name = self.unit_manager.get_family_name
+        self.assertEqual(get_family_name('copy_of_svelo'), 'svelocity')
+        self.assertEqual(get_family_name('copy_of_svelo'), 'svelocity')
+        self.assertEqual(self.unit_manager.family_cache_info().hits, 1)
+
+    def test_adding_members_clears_the_cache(self):
+        self.assertEqual(self.unit_manager.get_family_name('foo'), 'unknown')
+        self.unit_manager.add_member('foo', 'pvelocity')
+        self.assertEqual(self.unit_manager.get_family_name('foo'),
+                         'pvelocity')
+
+
+class WildcardTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.unit_manager = UnitManager()
+
+    def test_same_matches_as_fnmatch(self):
+        wildcards = self.unit_manager._wildcards
+        names = ['seismic', 'my_seis_2', 'avo_near', 'fracture', 'xyz',
+                 'stk_far', 'gr?x'] + [w.replace('*', 'a') for w in wildcards]
+        for name in names:
+            expected = next((w for w in wildcards if fnmatch(name, w)), '')
+            self.assertEqual(self.unit_manager._match_wildcards(name),
+                             expected, name)
+
+    def test_first_match_wins(self):
+        self.unit_manager.add_member('zz*', 'density')
+        self.unit_manager.add_member('*zz*', 'pvelocity')
+        self.assertEqual(self.unit_manager.get_family_name('zzq'), 'density')
+        self.assertEqual(self.unit_manager.get_family_name('qzzq'),
+                         'pvelocity')
+
+    def test_added_members_are_matched(self):
+        self.assertEqual(self.unit_manager.get_family_name('qqq_1'),
+                         'unknown')
+        self.unit_manager.add_member('q?q*', 'density')
+        self.assertEqual(self.unit_manager.get_family_name('qqq_1'),
+                         'density')
+        self.assertEqual(self.unit_manager.get_family_name('qq'), 'unknown')
+
+
+class GetFamilyNamesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.unit_manager = UnitManager()
+
+    def test_aligned_with_get_family_name(self):
+        names = ['svelo', 'vpsand', 'svelo', '', None, 'my_seis_2',
+                 'copy_of_den_1', 'xyz', 'xyz', 'DT']
+        families = self.unit_manager.get_family_names(names)
+        self.assertEqual(families, [UnitManager().get_family_name(name)
+                                    for name in names])
+        self.assertEqual(families[:2], ['svelocity', 'pvelocity'])
+
+    def test_wildcards_only_for_unmatched_names(self):
+        names = ['den_1', 'seismic', 'den_1', 'seismic', 'xyz']
+        with mock.patch.object(UnitManager, '_match_wildcards',
+                               wraps=self.unit_manager._match_wildcards) \
+                as match_wildcards:
+            self.unit_manager.get_family_names(names)
+        self.assertEqual([args[0] for args, _ in
+                          match_wildcards.call_args_list],
+                         ['seismic', 'xyz'])
+
+    def test_uses_but_does_not_fill_the_cache(self):
+        self.unit_manager.get_family_name('svelo')
+        self.unit_manager.get_family_names(['svelo', 'vpsand'])
+        info = self.unit_manager.family_cache_info()
+        self.assertEqual((info.hits, info.size), (1, 1))
+
+
+class FamilyNameForValueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.unit_manager = UnitManager()
+
+    def scan(self, unit_value):
+        for family_name in self.unit_manager.unit_families:
+            if unit_value in self.unit_manager.get_valid_units(family_name):
+                return family_name
+        return None
+
+    def test_same_as_scanning_the_families(self):
+        values = [valid_unit
+                  for family_name in self.unit_manager.unit_families
+                  for valid_unit in
+                  self.unit_manager.get_valid_units(family_name)]
+        values += [unit_parser.parse_unit('g/cc'), foot, furlong_per_second,
+                   None]
+        for value in values:
+            self.assertEqual(self.unit_manager.get_family_name_for_value(value),
+                             self.scan(value), value)
+
+    def test_index_is_rebuilt_when_families_are_added(self):
+        self.assertIsNone(
+            self.unit_manager.get_family_name_for_value(furlong_per_second))
+        for unit_system in self.unit_manager.unit_systems:
+            unit_system.add_family('furlongs', furlong_per_second)
+        self.unit_manager.add_family('furlongs', 'Furlong speed', 'none')
+        self.unit_manager.add_member('furlongs', 'furlongs')
+        self.assertEqual(
+            self.unit_manager.get_family_name_for_value(furlong_per_second),
+            'furlongs')
+
+    def test_index_is_rebuilt_when_systems_are_added(self):
+        unit_system = copy_first_system(self.unit_manager, 'FURLONG')
+        unit_system.add_family('pvelocity', furlong_per_second)
+        self.assertIsNone(
+            self.unit_manager.get_family_name_for_value(furlong_per_second))
+        self.unit_manager.add_unit_system(unit_system)
+        self.assertEqual(
+            self.unit_manager.get_family_name_for_value(furlong_per_second),
+            'pvelocity')
+
+
+class ValidUnitsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.unit_manager = UnitManager()
+
+    def test_results_are_memoized(self):
+        units = self.unit_manager.get_valid_units('pvelocity')
+        self.assertEqual([u.label for u in units],
+                         sorted(u.label for u in units))
+        self.assertEqual(self.unit_manager.get_valid_unit_strings('vp'),
+                         [u.label for u in units])
+
+        with mock.patch.object(UnitSystem, 'units') as system_units:
+            self.assertEqual(self.unit_manager.get_valid_units('pvelocity'),
+                             units)
+            self.assertTrue(
+                self.unit_manager.is_compatible(units[0].label, 'vp'))
+        self.assertFalse(system_units.called)
+
+    def test_results_are_copies(self):
+        self.unit_manager.get_valid_unit_strings('pvelocity').append('x')
+        self.assertNotIn('x',
+                         self.unit_manager.get_valid_unit_strings('pvelocity'))
+
+    def test_invalidated_by_add_member(self):
+        self.assertEqual(self.unit_manager.get_valid_units('foo'),
+                         self.unit_manager.get_valid_units('unknown'))
+        self.unit_manager.add_member('foo', 'pvelocity')
+        self.assertEqual(self.unit_manager.get_valid_units('foo'),
+                         self.unit_manager.get_valid_units('pvelocity'))
+
+    def test_invalidated_by_adding_systems_and_families(self):
+        unit_system = copy_first_system(self.unit_manager, 'FURLONG')
+        self.assertNotIn(
+            'furlong/s',
+            self.unit_manager.get_valid_unit_strings('pvelocity'))
+
+        self.unit_manager.add_unit_system(unit_system)
+        unit_system.add_family('pvelocity', furlong_per_second)
+        self.assertIn('furlong/s',
+                      self.unit_manager.get_valid_unit_strings('pvelocity'))
+        self.assertTrue(
+            self.unit_manager.is_compatible(furlong_per_second, 'pvelocity'))
+
+
+class IsCompatibleTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.unit_manager = UnitManager()
+
+    def test_compatibility(self):
+        is_compatible = self.unit_manager.is_compatible
+        self.assertTrue(is_compatible('ft/s', 'pvelocity'))
+        self.assertTrue(is_compatible(foot / second, 'vp'))
+        # Slowness converts to velocity as its inverse.
+        self.assertTrue(is_compatible(second / foot, 'pvelocity'))
+        self.assertFalse(is_compatible(foot, 'pvelocity'))
+        self.assertFalse(is_compatible('g/cc', 'pvelocity'))
+        self.assertFalse(is_compatible('none', 'pvelocity'))
+        self.assertTrue(is_compatible(foot, 'unknown'))
+
+    def test_no_conversion_is_attempted(self):
+        with mock.patch('scimath.units.convert.ConversionPlan') as plan:
+            self.assertFalse(self.unit_manager.is_compatible(foot,
+                                                             'pvelocity'))
+            self.assertTrue(self.unit_manager.is_compatible(second / foot,
+                                                            'pvelocity'))
+        self.assertFalse(plan.called)
+
+    def test_results_are_cached(self):
+        self.unit_manager.is_compatible('lb/ft**3', 'density')
+        with mock.patch.object(unit_parser, 'parse_unit') as parse_unit, \
+                mock.patch.object(UnitManager, '_is_compatible') as decide:
+            self.assertTrue(
+                self.unit_manager.is_compatible('lb/ft**3', 'density'))
+        self.assertFalse(parse_unit.called)
+        self.assertFalse(decide.called)
+
+    def test_invalidated_when_the_parser_is_extended(self):
+        self.assertFalse(self.unit_manager.is_compatible('cuwl', 'depth'))
+        # Restore the loaded, unextended parser.
+        self.addCleanup(unit_parser.parser.load)
+        self.addCleanup(unit_parser.parser.init)
+        unit_parser.parser.extend(sample_units)
+        self.assertTrue(self.unit_manager.is_compatible('cuwl', 'depth'))
+
+    def test_invalidated_when_the_default_system_changes(self):
+        unit_system = copy_first_system(self.unit_manager, 'ODD')
+        unit_system.add_family('pvelocity', 'g/cc')
+        self.unit_manager.add_unit_system(unit_system)
+
+        self.assertFalse(
+            self.unit_manager.is_compatible('lb/ft**3', 'pvelocity'))
+        self.unit_manager.set_default('ODD')
+        self.assertTrue(
+            self.unit_manager.is_compatible('lb/ft**3', 'pvelocity'))
@@ -27,7 +27,8 @@ from scimath.units.time import second
 # Numerical modeling library imports
 from scimath.units.api import UnitArray, UnitScalar
 from scimath.units.unit_manipulation import \
-    convert_units, set_units, have_some_units, strip_units
+    convert_units, set_units, have_some_units, strip_units, \
+    unit_array_units_converter
 
 
 class ConvertUnitsTestCase(unittest.TestCase):
@@ -109,6 +110,15 @@ class ConvertUnitsTestCase(unittest.TestCase):
         self.assertTrue(allclose(a, aa.as_units(meters)))
         self.assertEqual(aa.units, feet)
 
+    def test_convert_unit_array_inplace(self):
+        """ Does an in-place conversion reuse the array?
+        """
+        a = UnitArray((1., 2., 3.), units=meters)
+        aa = unit_array_units_converter(a, feet, inplace=True)
+        self.assertIs(aa, a)
+        self.assertEqual(aa.units, feet)
+        self.assertTrue(allclose(aa.as_units(meters), [1., 2., 3.]))
+
     def test_incompatible_array_units_raise_exception(self):
         """ Does a units mismatch raise an exception?
 
@@ -0,0 +1,403 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Tests for the UnitParser.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from scimath.units.acceleration import feet_per_second_squared
+from scimath.units.density import grams_per_cubic_centimeter
+from scimath.units.dimensionless import percent
+from scimath.units.electromagnetism import ohm
+from scimath.units.length import foot, inch, meter
+from scimath.units.registry_cache import build_snapshots
+from scimath.units.tests import sample_units
+from scimath.units.time import second
+from scimath.units import unit_module_index
+from scimath.units.unit import unit
+from scimath.units.unit_module_index import build_unit_names
+from scimath.units.unit_parser import (
+    Parser, UnableToParseUnits, UnitParser, unit_parser
+)
+
+
+#: The calls of record_call().
+calls = []
+
+
+def record_call(*args):
+    calls.append(args)
+
+
+class _RunsCode(object):
+    """ Calls record_call() when unpickled.
+    """
+
+    def __reduce__(self):
+        return (record_call, ('unpickled',))
+
+
+def reset_unit_parser():
+    """ Loads all the units and empties the cache of the unit parser.
+    """
+    unit_parser.parser.load()
+    unit_parser._reset()
+
+
+class UnitParserCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        reset_unit_parser()
+
+    def tearDown(self):
+        unit_parser.cache.max_size = 1024
+
+    def test_parse_unit_is_cached(self):
+        first = unit_parser.parse_unit('g/cc')
+        self.assertIs(unit_parser.parse_unit('g/cc'), first)
+        self.assertEqual(first, grams_per_cubic_centimeter)
+
+        info = unit_parser.cache.cache_info()
+        self.assertEqual((info.hits, info.misses, info.size), (1, 1, 1))
+
+    def test_flags_are_part_of_the_key(self):
+        unit_parser.parse_unit('g/cc')
+        unit_parser.parse_unit('g/cc', suppress_unknown=False)
+        self.assertEqual(len(unit_parser.cache), 2)
+
+    def test_failures_are_not_cached_when_raising(self):
+        for i in range(2):
+            with self.assertRaises(UnableToParseUnits):
+                unit_parser.parse_unit('not_a_unit', suppress_unknown=False)
+        self.assertEqual(len(unit_parser.cache), 0)
+
+        self.assertFalse(unit_parser.parse_unit('not_a_unit').valid)
+        self.assertEqual(len(unit_parser.cache), 1)
+
+    def test_cache_size(self):
+        unit_parser.cache.max_size = 2
+        for label in ['m', 'ft', 'g/cc']:
+            unit_parser.parse_unit(label)
+        self.assertEqual(unit_parser.cache.cache_info().evictions, 1)
+        unit_parser.parse_unit('m')
+        self.assertEqual(unit_parser.cache.cache_info().misses, 4)
+
+    def test_extending_the_parser_clears_the_cache(self):
+        unit_parser.parse_unit('m')
+        unit_parser.parser.extend()
+        unit_parser.parse_unit('m')
+        self.assertEqual(unit_parser.cache.cache_info().misses, 1)
+
+
+class ParseUnitsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        reset_unit_parser()
+
+    def test_aligned_with_labels(self):
+        labels = ['g/cc', 'ohm.m', 'g/cc', 'ohm*m', 'ft']
+        units, unknown = unit_parser.parse_units(labels)
+
+        self.assertEqual(len(units), len(labels))
+        self.assertEqual(units, [unit_parser.parse_unit(label)
+                                 for label in labels])
+        self.assertIs(units[0], units[2])
+        self.assertIs(units[1], units[3])
+        self.assertEqual(unknown, [])
+
+    def test_each_distinct_label_is_parsed_once(self):
+        unit_parser.parse_units(['m', 'm', 'm.s', 'm*s', 'm'])
+        self.assertEqual(unit_parser.cache.cache_info().misses, 2)
+
+    def test_unknown_labels_are_reported_together(self):
+        labels = ['m', 'foo', 'baz', 'foo']
+        result = unit_parser.parse_units(labels)
+        self.assertEqual([u.valid for u in result.units],
+                         [True, False, False, False])
+        self.assertEqual(result.unknown, ['foo', 'baz'])
+        self.assertEqual(unit_parser.parse_units(['m', 'ft']).unknown, [])
+
+        with self.assertRaises(UnableToParseUnits) as context:
+            unit_parser.parse_units(labels, suppress_unknown=False)
+        self.assertEqual(context.exception.labels, ['foo', 'baz'])
+        self.assertIn("'foo', 'baz'", str(context.exception))
+
+
+class LabelIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        reset_unit_parser()
+
+    def parse_without_expressions(self, label):
+        with mock.patch.object(unit_parser.parser, 'parse') as parse:
+            _unit = unit_parser.parse_unit(label)
+        self.assertFalse(parse.called, label)
+        return _unit
+
+    def test_names_and_exact_labels(self):
+        self.assertEqual(self.parse_without_expressions('ft'), foot)
+        self.assertEqual(self.parse_without_expressions('ft/s^2'),
+                         feet_per_second_squared)
+
+    def test_dotted_labels(self):
+        _unit = self.parse_without_expressions('g.ft/(cc.s)')
+        self.assertEqual(_unit, unit_parser.parse_unit('g*ft/(cc*s)'))
+        self.assertEqual(_unit.label, 'g*ft/(cc*s)')
+        # Other dotted labels are parsed as expressions.
+        self.assertEqual(unit_parser.parse_unit('ohm.m'), ohm * meter)
+
+    def test_aliases(self):
+        self.assertEqual(self.parse_without_expressions('%').label, '%')
+        self.assertEqual(self.parse_without_expressions('%'), percent)
+        _unit = self.parse_without_expressions('IN')
+        self.assertEqual((_unit, _unit.label), (inch, 'IN'))
+        _unit = self.parse_without_expressions('Unknown')
+        self.assertEqual((_unit.value, _unit.label), (1, 'none'))
+
+    def test_index_is_built_when_loaded(self):
+        index = unit_parser._label_index
+        self.assertIn('ft', index.units)
+        self.assertIn('g/cc', index.units)
+        self.assertIn('g.ft/(cc.s)', index.units)
+        self.assertIn('g/cc', index.folded)
+        # Expressions are left to the cache of parsed labels.
+        self.assertNotIn('ohm.m', index.units)
+
+    def test_lower_case_labels(self):
+        _unit = self.parse_without_expressions('G/CC')
+        self.assertEqual(_unit, grams_per_cubic_centimeter)
+        self.assertEqual(_unit.label, 'g/cc')
+        _unit = self.parse_without_expressions('FT')
+        self.assertEqual((_unit, _unit.label), (foot, 'ft'))
+        _unit = unit_parser.parse_unit('OHM.M')
+        self.assertEqual((_unit, _unit.label), (ohm * meter, 'ohm*m'))
+
+
+class LazyParserTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Snapshots are loaded whole rather than lazily.
+        patcher = mock.patch.dict(os.environ, {'SCIMATH_CACHE_DIR': ''})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.parser = unit_parser.parser
+        self.parser.init()
+
+    def tearDown(self):
+        self.parser.init()
+
+    def test_modules_are_loaded_on_demand(self):
+        self.assertEqual(self.parser.parse('ft/s'), foot / second)
+        self.assertFalse(self.parser.loaded)
+
+        # Exact labels need all the units.
+        self.assertEqual(self.parser.parse('ft/s^2'), feet_per_second_squared)
+        self.assertTrue(self.parser.loaded)
+
+    def test_same_context_as_loading_everything(self):
+        self.parser.load()
+        context = dict(self.parser.context)
+        for name, value in context.items():
+            self.parser.init()
+            self.assertIs(self.parser.context[name], value, name)
+            self.assertFalse(self.parser.loaded)
+
+    def test_unit_module_index_is_up_to_date(self):
+        # Run scimath/units/unit_module_index.py to update the table.
+        self.assertEqual(build_unit_names(Parser.unit_modules),
+                         unit_module_index.unit_names)
+
+    def test_only_units_are_found(self):
+        for name in ['unit', 'copy', '__name__', 'not_a_unit']:
+            with self.assertRaises(KeyError):
+                self.parser.context[name]
+
+    def test_extend_before_loading(self):
+        self.parser.extend(sample_units)
+        self.assertEqual(self.parser.parse('custom_unit'),
+                         sample_units.custom_unit)
+        self.assertFalse(self.parser.loaded)
+        self.assertEqual(self.parser.parse('cuwl'), sample_units.custom_unit)
+        self.assertTrue(self.parser.loaded)
+        self.assertEqual(self.parser.parse('custom_unit'),
+                         sample_units.custom_unit)
+
+
+    def test_extend_does_not_modify_the_published_context(self):
+        self.parser.parse('mm')
+        context = self.parser.context
+        names = dict(context)
+        self.parser.extend(sample_units)
+        self.assertEqual(dict(context), names)
+        self.assertIs(self.parser.context['custom_unit'],
+                      sample_units.custom_unit)
+
+    def test_new_unit_parsers_keep_the_shared_units(self):
+        self.parser.extend(sample_units)
+        self.assertIs(UnitParser().parser, self.parser)
+        self.assertTrue(self.parser.extended)
+        self.assertEqual(self.parser.parse('custom_unit'),
+                         sample_units.custom_unit)
+
+    def test_parsers_have_their_own_units(self):
+        other = Parser()
+        other.extend(sample_units)
+        self.assertEqual(other.parse('custom_unit'),
+                         sample_units.custom_unit)
+        self.assertFalse(self.parser.extended)
+        with self.assertRaises(Exception):
+            self.parser.parse('custom_unit')
+
+class ConcurrentParsingTestCase(unittest.TestCase):
+
+    labels = [
+        'g/cc', 'ft/s^2', 'ohm.m', 'm/s', 'kg*m/s**2', 'G/CC', '%', 'IN',
+        'degC+10', 'not_a_unit', 'MPa/100ft', 'km', 'lb/ft**3',
+    ]
+
+    def setUp(self):
+        # Switch threads as often as possible to provoke races.
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        patcher = mock.patch.dict(os.environ, {'SCIMATH_CACHE_DIR': ''})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(reset_unit_parser)
+
+    def parse_concurrently(self, labels):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(unit_parser.parse_unit, labels))
+
+    def test_same_results_as_serial_parsing(self):
+        reset_unit_parser()
+        expected = [unit_parser.parse_unit(label) for label in self.labels]
+
+        for i in range(5):
+            # Start from unloaded unit modules, so that the threads race to
+            # load them.
+            unit_parser.parser.init()
+            units = self.parse_concurrently(self.labels * 20)
+            self.assertEqual(units, expected * 20)
+            self.assertEqual([u.label for u in units],
+                             [u.label for u in expected] * 20)
+
+    def test_parsing_while_extending(self):
+        reset_unit_parser()
+        labels = ['custom_unit', 'm/s', 'g/cc'] * 200
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            units = executor.map(unit_parser.parse_unit, labels)
+            for i in range(20):
+                executor.submit(unit_parser.parser.extend, sample_units)
+            units = list(units)
+
+        self.assertTrue(all(u.valid for u in units[1::3]))
+        self.assertTrue(all(u.valid for u in units[2::3]))
+        self.assertEqual(unit_parser.parse_unit('custom_unit'),
+                         sample_units.custom_unit)
+
+
+class ParserSnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch.dict(os.environ,
+                                  {'SCIMATH_CACHE_DIR': self.directory})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Restored by the patcher.
+        os.environ.pop('SCIMATH_WRITE_CACHE', None)
+        self.parser = unit_parser.parser
+        self.addCleanup(self.parser.init)
+
+    def load(self, save_snapshot=True):
+        self.parser.init()
+        with mock.patch.object(Parser, '_loadModules',
+                               wraps=self.parser._loadModules) as modules:
+            self.parser.load(save_snapshot=save_snapshot)
+        return modules.called
+
+    def test_snapshot_is_saved_and_loaded(self):
+        self.assertTrue(self.load())
+        context = dict(self.parser.context)
+        exact_labels = dict(self.parser.exact_labels)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.directory, 'unit_parser.json')))
+
+        self.assertFalse(self.load())
+        self.assertEqual(list(self.parser.context), list(context))
+        for name, value in context.items():
+            if isinstance(value, unit) and value.label is not None:
+                # Labelled units are interned.
+                self.assertIs(self.parser.context[name], value)
+            else:
+                self.assertEqual(self.parser.context[name], value)
+        self.assertEqual(self.parser.exact_labels, exact_labels)
+
+    def test_snapshot_is_only_saved_on_request(self):
+        path = os.path.join(self.directory, 'unit_parser.json')
+        self.load(save_snapshot=None)
+        self.assertFalse(os.path.exists(path))
+
+        with mock.patch.dict(os.environ, {'SCIMATH_WRITE_CACHE': '1'}):
+            self.load(save_snapshot=None)
+        self.assertTrue(os.path.exists(path))
+        self.assertFalse(self.load(save_snapshot=None))
+
+    def test_build_snapshots(self):
+        build_snapshots()
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['unit_db.json', 'unit_parser.json'])
+        self.assertFalse(self.load(save_snapshot=None))
+
+    def test_snapshot_is_rebuilt_when_sources_change(self):
+        self.load()
+        with mock.patch.object(Parser, '_sourceFingerprint',
+                               return_value='changed'):
+            self.assertTrue(self.load())
+            self.assertFalse(self.load())
+
+    def test_lookups_do_not_load_the_snapshot(self):
+        self.load()
+        self.parser.init()
+        self.assertEqual(self.parser.parse('ft'), foot)
+        self.assertFalse(self.parser.loaded)
+
+    def test_unreadable_snapshot_is_ignored(self):
+        with open(os.path.join(self.directory, 'unit_parser.json'),
+                  'wb') as snapshot:
+            snapshot.write(b'not JSON')
+        self.assertTrue(self.load())
+        self.assertFalse(self.load())
+
+    def test_snapshot_cannot_run_code(self):
+        path = os.path.join(self.directory, 'unit_parser.json')
+        self.load()
+        with open(path, 'rb') as snapshot:
+            fingerprint = json.loads(snapshot.read().decode('utf-8'))[0]
+        for content in [pickle.dumps(_RunsCode()),
+                        json.dumps([fingerprint, [[], {'_RunsCode': []}]]),
+                        json.dumps([fingerprint,
+                                    [[['_RunsCode']], {'unit': 0}]])]:
+            with open(path, 'wb') as snapshot:
+                snapshot.write(content if isinstance(content, bytes) else
+                               content.encode('utf-8'))
+            self.assertTrue(self.load())
+        self.assertEqual(calls, [])
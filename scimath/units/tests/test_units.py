@@ -247,8 +247,7 @@ class test_units(unittest.TestCase):
         for i, label in enumerate(unit._labels):
             derivation = [0] * len(unit._labels)
             derivation[i] = 1
-            base_unit = unit(1.0, tuple(derivation))
-            base_unit.label = label
+            base_unit = unit(1.0, tuple(derivation), label=label)
             self.assertEqual(
                 unit_parser.parse_unit(label, suppress_unknown=False),
                 base_unit,
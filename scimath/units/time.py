@@ -34,28 +34,18 @@ from .SI import pico, nano, micro, milli
 # Data taken from Appendix F of Halliday, Resnick, Walker,
 #     "Fundamentals of Physics", fourth edition, John Willey and Sons, 1993
 
-second.label = 'second'
-picosecond = pico * second
-picosecond.label = 'picosecond'
-nanosecond = nano * second
-nanosecond.label = 'nanosecond'
-microsecond = micro * second
-microsecond.label = 'microsecond'
-millisecond = milli * second
-millisecond.label = 'millisecond'
+picosecond = (pico * second).with_label('picosecond')
+nanosecond = (nano * second).with_label('nanosecond')
+microsecond = (micro * second).with_label('microsecond')
+millisecond = (milli * second).with_label('millisecond')
 
 # other common units
 
-minute = 60 * second
-minute.label = "minute"
-hour = 60 * minute
-hour.label = "hour"
-day = 24 * hour
-day.label = "day"
-week = 7 * day
-week.label = "week"
-year = 365.25 * day
-year.label = "year"
+minute = (60 * second).with_label("minute")
+hour = (60 * minute).with_label("hour")
+day = (24 * hour).with_label("day")
+week = (7 * day).with_label("week")
+year = (365.25 * day).with_label("year")
 
 #############################################################################
 # Aliases:
@@ -17,21 +17,178 @@
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 import operator
+import threading
+import weakref
 
 import numpy
 
+from scimath.units.lru_cache import CacheInfo
+
+
+def _read_only(name, doc):
+    """ Returns a property reading the private slot of an attribute of units.
+    """
+    def refuse(self, *args):
+        raise AttributeError(
+            "%s objects are immutable; use with_label() to relabel a unit"
+            % type(self).__name__)
+
+    return property(operator.attrgetter('_' + name), refuse, refuse, doc)
+
 
 class unit(object):
+    """ A physical unit: a magnitude relative to a derivation in SI units.
+
+    Units are immutable, so they can be hashed, shared and used as cache
+    keys.  Use `with_label` to obtain a labelled variant of a unit.
+
+    Labelled units are interned: the first unit constructed with a given
+    value, derivation, offset and label is registered, and `with_label`,
+    unpickling and the registry snapshots return it for as long as it
+    lives.  Constructing a unit always creates a new object, and unit
+    arithmetic creates unlabelled units; units compare and hash equal to
+    the units they are equivalent to.
+
+    Derivations with small integer exponents are also kept packed into a
+    single integer (see `_pack_derivation`), so that multiplying, dividing,
+    raising to an integer power and comparing derivations are single integer
+    operations.  A unit created from a derivation tuple packs it when it is
+    first needed, and a unit computed in packed form only builds its
+    `derivation` tuple when it is first needed.
+    """
+
+    __slots__ = ('_value', '_derivation', '_dims', '_offset', '_label',
+                 '__weakref__')
 
     _labels = ('m', 'kg', 's', 'A', 'K', 'mol', 'cd')
     _zero = (0,) * len(_labels)
     _negativeOne = (-1, ) * len(_labels)
 
-    def __init__(self, value, derivation, offset=0.0):
-        self.value = value
-        self.derivation = derivation
-        self.label = None
-        self.offset = offset
+    # The constructor arguments, in order, which define a unit.
+    _fields = ('value', 'derivation', 'offset', 'label')
+
+    # The constructor arguments of a subclass besides value, derivation,
+    # offset and label.
+    _extra_fields = ()
+
+    value = _read_only('value', "The magnitude of the unit, in SI units.")
+    offset = _read_only('offset', "The offset of the unit, in SI units.")
+    label = _read_only('label', "The label of the unit, or None.")
+
+    def __init__(self, value, derivation, offset=0.0, label=None):
+        if type(derivation) is tuple:
+            # Packed when first needed, see _packed_dims().
+            dims = None
+        elif type(derivation) is int:
+            dims = derivation
+            derivation = None
+        elif derivation is None:
+            raise TypeError("%s() requires a derivation" % type(self).__name__)
+        else:
+            derivation = tuple(derivation)
+            dims = None
+        self._value = value
+        self._derivation = derivation
+        self._dims = dims
+        self._offset = offset
+        self._label = label
+        if label is not None:
+            _register(self)
+
+    @classmethod
+    def _intern(cls, *args):
+        """ Returns the interned unit of cls for the constructor arguments.
+        """
+        return _register(cls(*args))
+
+    def _intern_key(self):
+        """ The attributes which identify an interned unit.
+        """
+        return ((type(self), type(self._value), self._value,
+                 self._dimension_key(), self._offset, self._label) +
+                tuple(getattr(self, '_' + name)
+                      for name in self._extra_fields))
+
+    @property
+    def derivation(self):
+        """ The exponents of the SI base units, in the order of `_labels`.
+        """
+        derivation = self._derivation
+        if derivation is None:
+            derivation = self._derivation = _unpack_derivation(self._dims)
+        return derivation
+
+    def with_label(self, label):
+        """ Returns a unit identical to this one but with the given label.
+        """
+        return self._replace(label=label)
+
+    def _replace(self, **changes):
+        changes.setdefault('derivation', self._dimension_key())
+        args = [changes.get(name, getattr(self, name))
+                for name in self._fields]
+        return type(self)._intern(*args)
+
+    def _packed_dims(self):
+        """ Returns the packed derivation, or None if it cannot be packed.
+        """
+        dims = self._dims
+        if dims is None:
+            dims = _pack_derivation(self._derivation)
+            if dims is not None:
+                self._dims = dims
+        return dims
+
+    def _dimension_key(self):
+        """ The packed derivation if there is one, else the derivation tuple.
+        """
+        dims = self._dims
+        if dims is None:
+            dims = self._packed_dims()
+            if dims is None:
+                return self._derivation
+        return dims
+
+    def _same_dimensions(self, other):
+        dims = self._dims
+        other_dims = other._dims
+        if dims is None or other_dims is None:
+            return self.derivation == other.derivation
+        return dims == other_dims
+
+    def _inverse_dimensions(self, other):
+        """ Returns True if self * other is dimensionless.
+        """
+        dims = _combine_dims(self._dims, other._dims, 1)
+        if dims is None:
+            return tuple(map(operator.add, self.derivation,
+                             other.derivation)) == self._zero
+        return dims == _DIMENSIONLESS
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        args = tuple(getattr(self, name) for name in self._fields)
+        if self._label is None:
+            return (type(self), args)
+        return (type(self)._intern, args)
+
+    def __setstate__(self, state):
+        """ Restores units pickled before units were immutable.
+        """
+        state.setdefault('offset', 0.0)
+        state.setdefault('label', None)
+        derivation = tuple(state.pop('derivation'))
+        state['_derivation'] = derivation
+        state['_dims'] = _pack_derivation(derivation)
+        for name, value in state.items():
+            if not name.startswith('_'):
+                name = '_' + name
+            setattr(self, name, value)
 
     def __eq__(self, other):
         """ Are these the same types of units (e.g., feet) """
@@ -42,9 +199,9 @@ class unit(object):
         if not isinstance(other, unit):
             return False
 
-        return self.value == other.value and \
-            self.derivation == other.derivation and \
-            self.offset == other.offset
+        return self._value == other._value and \
+            self._same_dimensions(other) and \
+            self._offset == other._offset
 
     def __ne__(self, other):
 
@@ -54,97 +211,159 @@ class unit(object):
         if not isinstance(other, unit):
             return True
 
-        return self.value != other.value or \
-            self.derivation != other.derivation or\
-            self.offset != other.offset
+        return self._value != other._value or \
+            not self._same_dimensions(other) or\
+            self._offset != other._offset
 
     def __hash__(self):
-        return hash(("scimath.unit", self.value, self.derivation, self.offset))
+        return hash(("scimath.unit", self._value, self._dimension_key(),
+                     self._offset))
 
     def __add__(self, other):
-        if not self.derivation == other.derivation:
+        if not self._same_dimensions(other):
             raise IncompatibleUnits("add", self, other)
 
-        return unit(self.value + other.value, self.derivation)
+        return _derived_unit(self._value + other._value, self._dims,
+                             self._derivation)
 
     def __sub__(self, other):
-        if not self.derivation == other.derivation:
+        if not self._same_dimensions(other):
             raise IncompatibleUnits("subtract", self, other)
 
-        return unit(self.value - other.value, self.derivation)
+        return _derived_unit(self._value - other._value, self._dims,
+                             self._derivation)
 
     def __mul__(self, other):
-        if self._compatibleNumericType(other):
-            return unit(other * self.value, self.derivation)
-
-        value = self.value * other.value
-        derivation = tuple(
-            map(operator.add, self.derivation, other.derivation))
-
-        if derivation == self._zero:
+        if isinstance(other, _NUMERIC_TYPES):
+            return _derived_unit(other * self._value, self._dims,
+                                 self._derivation)
+
+        key = (id(self), id(other))
+        entry = _products.get(key)
+        if entry is not None:
+            unit_algebra_cache.hits += 1
+            return entry[2]
+        return _memoized(_products, key, unit._multiply, self, other)
+
+    def _multiply(self, other):
+        value = self._value * other._value
+        dims = _combine_dims(self._dims, other._dims, 1)
+        if dims is None:
+            dims = _combine_dims(self._packed_dims(), other._packed_dims(), 1)
+        if dims is None:
+            derivation = tuple(map(operator.add, self.derivation,
+                                   other.derivation))
+            if derivation == self._zero:
+                return value
+            return _derived_unit(value, None, derivation)
+        elif dims == _DIMENSIONLESS:
             return value
 
-        return unit(value, derivation)
+        return _derived_unit(value, dims)
 
     def __div__(self, other):
         return type(self).__truediv__(self, other)
 
     def __truediv__(self, other):
-        if self._compatibleNumericType(other):
-            return unit(self.value / other, self.derivation)
-
-        value = self.value / other.value
-        derivation = tuple(
-            map(operator.sub, self.derivation, other.derivation))
-
-        if derivation == self._zero:
+        if isinstance(other, _NUMERIC_TYPES):
+            return _derived_unit(self._value / other, self._dims,
+                                 self._derivation)
+
+        key = (id(self), id(other))
+        entry = _quotients.get(key)
+        if entry is not None:
+            unit_algebra_cache.hits += 1
+            return entry[2]
+        return _memoized(_quotients, key, unit._divide, self, other)
+
+    def _divide(self, other):
+        value = self._value / other._value
+        dims = _combine_dims(self._dims, other._dims, -1)
+        if dims is None:
+            dims = _combine_dims(self._packed_dims(), other._packed_dims(), -1)
+        if dims is None:
+            derivation = tuple(map(operator.sub, self.derivation,
+                                   other.derivation))
+            if derivation == self._zero:
+                return value
+            return _derived_unit(value, None, derivation)
+        elif dims == _DIMENSIONLESS:
             return value
 
-        return unit(value, derivation)
+        return _derived_unit(value, dims)
 
     def __pow__(self, other):
-        if not self._compatibleNumericType(other):
+        if not isinstance(other, _NUMERIC_TYPES):
             raise InvalidOperation("**", self, other)
 
-        value = self.value ** other
-        derivation = tuple(map(operator.mul, [other] * 7, self.derivation))
-
-        return unit(value, derivation)
+        key = (id(self), type(other), other)
+        try:
+            entry = _powers.get(key)
+        except TypeError:
+            return self._power(other)
+        if entry is not None:
+            unit_algebra_cache.hits += 1
+            return entry[2]
+        return _memoized(_powers, key, unit._power, self, other)
+
+    def _power(self, other):
+        value = self._value ** other
+        dims = None
+        if type(other) is int:
+            dims = _scale_dims(self._packed_dims(), other)
+        if dims is None:
+            derivation = tuple(map(operator.mul, [other] * 7,
+                                   self.derivation))
+            return _derived_unit(value, None, derivation)
+
+        return _derived_unit(value, dims)
 
     def __pos__(self): return self
 
     # TODO: I don't think these will work for derived classes...
-    def __neg__(self): return unit(-self.value, self.derivation)
+    def __neg__(self):
+        return _derived_unit(-self._value, self._dims, self._derivation)
 
-    def __abs__(self): return unit(abs(self.value), self.derivation)
+    def __abs__(self):
+        return _derived_unit(abs(self._value), self._dims, self._derivation)
 
     def __invert__(self):
-        value = 1. / self.value
-        derivation = tuple(
-            map(operator.mul, self._negativeOne, self.derivation))
-        return unit(value, derivation)
+        return self._inverse(1. / self._value)
 
     def __rmul__(self, other):
-        if not self._compatibleNumericType(other):
+        if not isinstance(other, _NUMERIC_TYPES):
             raise InvalidOperation("*", other, self)
 
-        return unit(other * self.value, self.derivation)
+        return _derived_unit(other * self._value, self._dims,
+                             self._derivation)
 
     def __rdiv__(self, other):
         return type(self).__rtruediv__(self, other)
 
     def __rtruediv__(self, other):
-        if not self._compatibleNumericType(other):
+        if not isinstance(other, _NUMERIC_TYPES):
             raise InvalidOperation("/", other, self)
 
-        value = other / self.value
-        derivation = tuple(
-            map(operator.mul, self._negativeOne, self.derivation))
+        return self._inverse(other / self._value)
 
-        return unit(value, derivation)
+    def _inverse(self, value):
+        """ Returns a unit of the given value and of the inverse derivation.
+        """
+        dims = _scale_dims(self._packed_dims(), -1)
+        if dims is None:
+            derivation = tuple(map(operator.mul, self._negativeOne,
+                                   self.derivation))
+            return _derived_unit(value, None, derivation)
+        return _derived_unit(value, dims)
+
+    def _inverse_dimension_key(self):
+        dims = _scale_dims(self._packed_dims(), -1)
+        if dims is None:
+            return tuple(map(operator.mul, self._negativeOne, self.derivation))
+        return dims
 
     def __float__(self):
-        if self.derivation == self._zero:
+        if self.is_dimensionless():
             return float(self.value)
         raise InvalidConversion(self)
 
@@ -188,19 +407,257 @@ class unit(object):
 
         return string
 
+    def is_dimensionless(self):
+        """ Returns True if the unit has no dimensions.
+        """
+        if self._dims is None:
+            return self.derivation == self._zero
+        return self._dims == _DIMENSIONLESS
+
     def _strDerivation(self):
         return _strDerivation(self._labels, self.derivation)
 
     def _compatibleNumericType(self, other):
-        return (isinstance(other, type(0)) or isinstance(other, type(0.0)) or
-                isinstance(other, numpy.ndarray))
+        return isinstance(other, _NUMERIC_TYPES)
+
+# Packed derivations.
+#
+# A derivation whose exponents are integers in [-_EXPONENT_LIMIT,
+# _EXPONENT_LIMIT) is packed into one integer, with each exponent stored in a
+# _FIELD_BITS wide field as exponent + _EXPONENT_LIMIT.  Adding, subtracting
+# or scaling packed derivations then adds, subtracts or scales the exponents
+# of all base units at once.  A valid field is always less than
+# 2 * _EXPONENT_LIMIT, so a result whose exponents leave the allowed range
+# sets one of the _GUARD bits (or is negative) and is rejected, in which case
+# the arithmetic falls back to derivation tuples.
+
+_FIELD_BITS = 32
+_EXPONENT_LIMIT = 2 ** 14
+_FIELD_MASK = 2 ** _FIELD_BITS - 1
+_BIAS = sum(_EXPONENT_LIMIT << (_FIELD_BITS * i)
+            for i in range(len(unit._labels)))
+_GUARD = sum((_FIELD_MASK & ~(2 * _EXPONENT_LIMIT - 1)) << (_FIELD_BITS * i)
+             for i in range(len(unit._labels)))
+# The largest power a packed derivation may be raised to without a field
+# overflowing into its neighbour.
+_MAX_POWER = 2 ** (_FIELD_BITS - 16)
+
+#: The packed derivation of dimensionless units.
+_DIMENSIONLESS = _BIAS
+
+# The packed forms of the derivation tuples seen so far, see
+# _pack_derivation().  Cleared when it grows past _MAX_PACKED_DERIVATIONS,
+# e.g. with many distinct fractional exponents.
+_packed_derivations = {}
+_MAX_PACKED_DERIVATIONS = 4096
+
+
+def _pack_derivation(derivation):
+    """ Returns the packed form of a derivation tuple, or None if it has none.
+
+    Each distinct derivation is packed once: the results are kept in
+    _packed_derivations.
+    """
+    try:
+        return _packed_derivations[derivation]
+    except KeyError:
+        pass
+    except TypeError:
+        return None
+
+    dims = _BIAS
+    if len(derivation) == len(unit._labels):
+        shift = 0
+        for exponent in derivation:
+            try:
+                integer = int(exponent)
+            except (TypeError, ValueError, OverflowError):
+                dims = None
+                break
+            if integer != exponent or \
+                    not -_EXPONENT_LIMIT <= integer < _EXPONENT_LIMIT:
+                dims = None
+                break
+            dims += integer << shift
+            shift += _FIELD_BITS
+    else:
+        dims = None
+
+    if len(_packed_derivations) >= _MAX_PACKED_DERIVATIONS:
+        _packed_derivations.clear()
+    _packed_derivations[derivation] = dims
+    return dims
+
+
+def _unpack_derivation(dims):
+    """ Returns the derivation tuple of a packed derivation.
+    """
+    return tuple(((dims >> (_FIELD_BITS * i)) & _FIELD_MASK) - _EXPONENT_LIMIT
+                 for i in range(len(unit._labels)))
+
+
+def _combine_dims(dims1, dims2, sign):
+    """ Adds (sign=1) or subtracts (sign=-1) two packed derivations.
+
+    Returns None if either derivation is not packed or if the result does
+    not fit in a packed derivation.
+    """
+    if dims1 is None or dims2 is None:
+        return None
+    dims = dims1 + sign * (dims2 - _BIAS)
+    if dims < 0 or dims & _GUARD:
+        return None
+    return dims
+
+
+def _scale_dims(dims, power):
+    """ Multiplies the exponents of a packed derivation by an integer.
+
+    Returns None if the derivation is not packed or if the result does not
+    fit in a packed derivation.
+    """
+    if dims is None or not -_MAX_POWER < power < _MAX_POWER:
+        return None
+    dims = (dims - _BIAS) * power + _BIAS
+    if dims < 0 or dims & _GUARD:
+        return None
+    return dims
+
+
+class _UnitAlgebraMemo(object):
+    """ Memo of the results of unit * unit, unit / unit and unit ** power.
+
+    Results are kept in one plain dict per operation, keyed on the identity
+    of the operands (units are immutable).  Hits are looked up without a
+    lock, and a table that reaches max_size entries is cleared rather than
+    trimmed.  The statistics are not updated atomically, so they are only
+    approximate when several threads do unit algebra.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.tables = ({}, {}, {})
+        self.hits = self.misses = self.evictions = 0
+
+    def clear(self):
+        """ Removes all entries and resets the statistics.
+        """
+        for table in self.tables:
+            table.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def cache_info(self):
+        """ Returns a CacheInfo tuple describing the state of the memo.
+        """
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         self.max_size, len(self))
+
+    def __len__(self):
+        return sum(len(table) for table in self.tables)
+
+
+#: Memo of the results of unit algebra.  Units with array values are not
+#: memoized.
+unit_algebra_cache = _UnitAlgebraMemo(max_size=1024)
+_products, _quotients, _powers = unit_algebra_cache.tables
+
+
+def _memoized(table, key, function, operand1, operand2):
+    """ Returns function(operand1, operand2) after a miss on key in table,
+    storing the result unless an operand has an array value.
+    """
+    if isinstance(operand1._value, numpy.ndarray):
+        return function(operand1, operand2)
+    if isinstance(operand2, unit):
+        if isinstance(operand2._value, numpy.ndarray):
+            return function(operand1, operand2)
+    elif table is not _powers:
+        return function(operand1, operand2)
+
+    result = function(operand1, operand2)
+    memo = unit_algebra_cache
+    memo.misses += 1
+    if len(table) >= memo.max_size:
+        memo.evictions += len(table)
+        table.clear()
+    # Entries hold references to their operands, so the ids in a key cannot
+    # be reused by other units while the entry is cached.
+    table[key] = (operand1, operand2, result)
+    return result
+
+
+# The table of interned units, see _register(): weak references to the
+# units by their _intern_key().  Entries are removed when their unit dies.
+_intern_table = {}
+_intern_lock = threading.RLock()
+
+
+def _register(self):
+    """ Returns the interned unit equal to the labelled unit self, interning
+    self if there is none.
+
+    Unlabelled units and units whose value is not hashable (e.g. an array)
+    are not interned.
+    """
+    if self._label is None:
+        return self
+    try:
+        key = self._intern_key()
+        reference = _intern_table.get(key)
+    except TypeError:
+        return self
+
+    # Looking up an interned unit takes no lock: only adding one does.
+    if reference is not None:
+        interned = reference()
+        if interned is not None:
+            return interned
+
+    with _intern_lock:
+        reference = _intern_table.get(key)
+        interned = reference() if reference is not None else None
+        if interned is None:
+            interned = self
+            _intern_table[key] = weakref.ref(
+                self, lambda reference: _forget(key, reference))
+    return interned
+
+
+def _forget(key, reference):
+    """ Removes the entry of an interned unit which died.
+    """
+    with _intern_lock:
+        if _intern_table.get(key) is reference:
+            del _intern_table[key]
+
+
+_new_object = object.__new__
+
+# The operands which scale a unit.
+_NUMERIC_TYPES = (int, float, numpy.ndarray)
+
+
+def _derived_unit(value, dims, derivation=None):
+    """ Returns an unlabelled unit, as computed by unit arithmetic.
+
+    At least one of the packed derivation, dims, and of the derivation tuple
+    must be given: a unit without dims packs its derivation when first
+    needed.
+    """
+    self = _new_object(unit)
+    self._value = value
+    self._derivation = derivation
+    self._dims = dims
+    self._offset = 0.0
+    self._label = None
+    return self
+
 
 # instances
 
-one = dimensionless = unit(1, unit._zero)
+one = dimensionless = unit(1, unit._zero, label="dimensionless")
 dim = none = dimensionless  # TODO: does it make any sense to assign 'none'
                       #       as a variable? ...not a very good name
-dimensionless.label = "dimensionless"
 
 # helpers
 
@@ -259,7 +716,4 @@ class IncompatibleUnits(Exception):
 def is_dimensionless(unit):
     """ Determines whether a unit is dimensionless, i.e., has no units.
     """
-    if unit.derivation == dimensionless.derivation:
-        return True
-
-    return False
+    return unit.is_dimensionless()
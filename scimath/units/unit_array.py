@@ -468,12 +468,29 @@ class UnitArray(numpy.ndarray):
 
     ### Unit Conversion ######################################################
 
-    def as_units(self, new_units):
+    def as_units(self, new_units, inplace=False, dtype=None):
         """ Convert UnitArray from its current units to a new set of units.
 
+        If inplace is True, the values of this array are overwritten with the
+        converted values and its units are changed; the array itself is
+        returned.  This requires a floating point dtype.
+
+        dtype is the dtype policy passed on to `convert`: None, 'preserve',
+        'promote' or an explicit dtype.
         """
-        result = self.__class__(convert(self.view(numpy.ndarray),
-                                        self.units, new_units))
+        if inplace:
+            convert(self.view(numpy.ndarray), self.units, new_units,
+                    inplace=True, dtype=dtype)
+            self.units = new_units
+            return self
+
+        data = self.view(numpy.ndarray)
+        converted = convert(data, self.units, new_units, dtype=dtype)
+        if isinstance(converted, numpy.ndarray) and converted is not data:
+            # The conversion already made a new array, don't copy it again.
+            result = self.__class__(converted, copy=False)
+        else:
+            result = self.__class__(converted)
         result.units = new_units
 
         return result
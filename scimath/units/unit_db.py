@@ -20,6 +20,7 @@ import logging
 from traits.util.resource import get_path
 
 # Local Imports:
+from scimath.units import registry_cache
 from scimath.units.unit_parser import unit_parser
 
 
@@ -31,6 +32,14 @@ class UnitDB(object):
         aliasing and formatting data from text files of the appropriate
         format. """
 
+    #: The default data files, in the 'data' directory next to this module.
+    data_files = ['unit_family_membership.txt', 'unit_families.txt',
+                  'unit_formatting.txt', 'unit_ranges.txt']
+
+    #: The tables filled from the data files.
+    tables = ['member_names', 'preferred_names', 'unit_names', 'column_names',
+              'unit_systems', 'unit_formats', 'unit_ranges']
+
     def __init__(self):
         """
         Initialize UnitDB object
@@ -43,6 +52,49 @@ class UnitDB(object):
         self.unit_formats = unit_formats = {}
         self.unit_ranges = unit_ranges = {}
 
+    def load(self, use_snapshot=True, save_snapshot=None):
+        """ Fills all the tables from the default data files.
+
+        The tables are loaded from a snapshot (see
+        scimath.units.registry_cache) instead of reading the data files and
+        parsing their units, if one was saved and neither the files nor the
+        units of the unit parser have changed.  Unless save_snapshot is given,
+        the tables read from the files are only saved in a snapshot if
+        requested through the environment (see registry_cache.save_on_load).
+        """
+        # Units added to the unit parser may change the parsed units.
+        use_snapshot = use_snapshot and not unit_parser.parser.extended
+        fingerprint = self._sourceFingerprint()
+        if use_snapshot:
+            snapshot = registry_cache.load_snapshot('unit_db', fingerprint)
+            if snapshot is not None:
+                for name in self.tables:
+                    setattr(self, name, snapshot[name])
+                return
+
+        self.get_family_members_from_file()
+        self.get_unit_families_from_file()
+        self.get_family_format_from_file()
+        self.get_family_ranges_from_file()
+
+        if save_snapshot is None:
+            save_snapshot = registry_cache.save_on_load()
+        if save_snapshot and not unit_parser.parser.extended:
+            registry_cache.save_snapshot(
+                'unit_db', fingerprint,
+                dict((name, getattr(self, name)) for name in self.tables))
+
+    def _sourceFingerprint(self):
+        """ The fingerprint of the data files and of the sources of the units
+        they are parsed into.
+        """
+        directory = os.path.join(get_path(self), 'data')
+        paths = [os.path.join(directory, filename)
+                 for filename in self.data_files]
+        paths.append(os.path.abspath(__file__))
+        paths.extend(unit_parser.parser._sourcePaths())
+        return registry_cache.source_fingerprint(paths)
+
     def get_family_members_from_file(self, filename=None):
         """Retrieves a list of family names and member lists from a file.
 
@@ -0,0 +1,296 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Compiles unit expressions such as 'g/cc' or 'kg*m**-3' into small
+evaluation programs.
+
+The grammar is the subset of Python expressions made of names, numbers,
+parentheses and the operators ``+``, ``-``, ``*``, ``/``, ``**`` and ``~``,
+with Python's precedence and associativity rules::
+
+    expression := term (('+' | '-') term)*
+    term       := factor (('*' | '/') factor)*
+    factor     := ('+' | '-' | '~') factor | power
+    power      := atom ['**' factor]
+    atom       := NAME | NUMBER | '(' expression ')'
+
+Nothing but the names of a unit table can be looked up, and integer powers
+are bounded (see `_MAX_POWER_BITS`), so unit labels from untrusted sources
+can be parsed safely.  Operations on numbers only, such as ``2**3``, are
+computed when the expression is compiled.
+"""
+
+# Standard library imports.
+import operator
+import re
+
+# Local imports.
+from scimath.units.lru_cache import LRUCache
+
+
+#: Compiled expressions, keyed by the expression string.  Strings which fail
+#: to compile are cached with their error message.
+expression_cache = LRUCache(max_size=4096)
+
+# Instructions of a compiled program.
+_NAME, _CONSTANT, _UNARY, _BINARY = range(4)
+
+#: The largest size, in bits, of an integer power such as 2**1000, so that
+#: labels like '2**2**2**25' cannot make the parser compute huge numbers.
+_MAX_POWER_BITS = 4096
+
+
+def _power(base, exponent):
+    """ Returns base ** exponent, refusing integer powers larger than
+    _MAX_POWER_BITS bits.
+    """
+    if type(base) is int and type(exponent) is int and exponent > 0 and \
+            (abs(base).bit_length() - 1) * exponent > _MAX_POWER_BITS:
+        raise UnitExpressionError(
+            "integer power of more than %d bits" % _MAX_POWER_BITS)
+    return base ** exponent
+
+
+_BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '**': _power,
+}
+
+_UNARY_OPERATORS = {
+    '+': operator.pos,
+    '-': operator.neg,
+    '~': operator.invert,
+}
+
+# A number may not run into a name, as in '100ft', just as in Python.
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?)(?![\w.])
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<operator>\*\*|[-+*/~()])
+    )""", re.VERBOSE | re.ASCII)
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+class UnitExpressionError(ValueError):
+    """ Raised when a string is not a valid unit expression.
+    """
+
+
+class UnitExpression(object):
+    """ A compiled unit expression.
+
+    Parameters
+    ----------
+    string : str
+        The expression.
+    program : tuple
+        The instructions of a stack machine evaluating the expression, in
+        postfix order.
+    """
+
+    __slots__ = ('string', 'program', 'names')
+
+    def __init__(self, string, program):
+        self.string = string
+        self.program = program
+        self.names = frozenset(arg for op, arg in program if op == _NAME)
+
+    def evaluate(self, context):
+        """ Evaluates the expression, looking names up in context.
+
+        Raises a NameError if a name is not in context.
+        """
+        program = self.program
+        if len(program) == 1:
+            op, arg = program[0]
+            if op == _CONSTANT:
+                return arg
+            return _lookup(context, arg)
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for op, arg in program:
+            if op == _NAME:
+                push(_lookup(context, arg))
+            elif op == _CONSTANT:
+                push(arg)
+            elif op == _UNARY:
+                push(arg(pop()))
+            else:
+                right = pop()
+                push(arg(pop(), right))
+        return stack[0]
+
+    def __repr__(self):
+        return "UnitExpression(%r)" % self.string
+
+
+def compile_unit_expression(string):
+    """ Returns the compiled UnitExpression for string.
+
+    Compiled expressions are cached in `expression_cache`.
+
+    Raises
+    ------
+    UnitExpressionError
+        if string is not a valid unit expression.
+    """
+    compiled = expression_cache.get(string)
+    if compiled is None:
+        try:
+            compiled = _Compiler(string).compile()
+        except UnitExpressionError as error:
+            compiled = str(error)
+        expression_cache.add(string, compiled)
+
+    if isinstance(compiled, str):
+        raise UnitExpressionError(compiled)
+    return compiled
+
+
+def _lookup(context, name):
+    try:
+        return context[name]
+    except KeyError:
+        raise NameError("name '%s' is not defined" % name)
+
+
+class _Compiler(object):
+    """ A recursive descent parser emitting a postfix program.
+    """
+
+    def __init__(self, string):
+        self.string = string
+        self.tokens = self._tokenize(string)
+        self.position = 0
+        self.program = []
+
+    def compile(self):
+        if not self.tokens:
+            raise UnitExpressionError("empty unit expression")
+        self._expression()
+        if self.position != len(self.tokens):
+            self._unexpected()
+        return UnitExpression(self.string, tuple(self.program))
+
+    def _tokenize(self, string):
+        tokens = []
+        position = 0
+        end = len(string)
+        while True:
+            position = _WHITESPACE.match(string, position).end()
+            if position == end:
+                return tokens
+            match = _TOKEN.match(string, position)
+            if match is None:
+                raise UnitExpressionError(
+                    "invalid unit expression %r at position %d"
+                    % (string, position))
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == 'number':
+                if text.isdigit():
+                    value = int(text)
+                else:
+                    value = float(text)
+                tokens.append((kind, value))
+            else:
+                tokens.append((kind, text))
+            position = match.end()
+
+    def _peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def _unexpected(self):
+        kind, text = self._peek()
+        if kind is None:
+            raise UnitExpressionError(
+                "unexpected end of unit expression %r" % self.string)
+        raise UnitExpressionError(
+            "unexpected %r in unit expression %r" % (text, self.string))
+
+    def _emit(self, kind, function):
+        """ Appends an operation to the program, or its result if its
+        operands are numbers.
+        """
+        program = self.program
+        count = 1 if kind == _UNARY else 2
+        operands = program[-count:]
+        if any(op != _CONSTANT for op, arg in operands):
+            program.append((kind, function))
+            return
+
+        try:
+            value = function(*[arg for op, arg in operands])
+        except UnitExpressionError as error:
+            raise UnitExpressionError(
+                "%s in unit expression %r" % (error, self.string))
+        except (ArithmeticError, TypeError) as error:
+            raise UnitExpressionError(
+                "cannot compute unit expression %r: %s" % (self.string, error))
+        program[-count:] = [(_CONSTANT, value)]
+
+    def _expression(self):
+        self._term()
+        while self._peek() in (('operator', '+'), ('operator', '-')):
+            symbol = self._next()[1]
+            self._term()
+            self._emit(_BINARY, _BINARY_OPERATORS[symbol])
+
+    def _term(self):
+        self._factor()
+        while self._peek() in (('operator', '*'), ('operator', '/')):
+            symbol = self._next()[1]
+            self._factor()
+            self._emit(_BINARY, _BINARY_OPERATORS[symbol])
+
+    def _factor(self):
+        kind, text = self._peek()
+        if kind == 'operator' and text in _UNARY_OPERATORS:
+            self._next()
+            self._factor()
+            self._emit(_UNARY, _UNARY_OPERATORS[text])
+        else:
+            self._power()
+
+    def _power(self):
+        self._atom()
+        if self._peek() == ('operator', '**'):
+            self._next()
+            self._factor()
+            self._emit(_BINARY, _power)
+
+    def _atom(self):
+        kind, value = self._next()
+        if kind == 'name':
+            self.program.append((_NAME, value))
+        elif kind == 'number':
+            self.program.append((_CONSTANT, value))
+        elif (kind, value) == ('operator', '('):
+            self._expression()
+            if self._next() != ('operator', ')'):
+                self.position -= 1
+                self._unexpected()
+        else:
+            self.position -= 1
+            self._unexpected()
@@ -16,19 +16,24 @@
 #############################################################################
 
 # Standard library imports.
-from fnmatch import fnmatch
+from collections import namedtuple, OrderedDict
+from fnmatch import translate
 import logging
+import os
+import re
 
 # Enthought library imports.
-from traits.api  import HasTraits, HasPrivateTraits, Trait, List, Dict, \
-    Instance, Str, Any, Int
+from traits.api  import HasPrivateTraits, List, Dict, Instance, Str, Any, \
+    Int
 
 # local imports
 from scimath.units.unit_db import UnitDB
 from scimath.units.unit_system import UnitSystem
 from scimath.units.unit_converter import default_unit_converters
 from scimath.units.convert import convert as unit_convert
-from .unit import unit
+from scimath.units.lazy_instance import LazyInstance
+from scimath.units.lru_cache import CacheInfo, LRUCache
+from .unit import dimensionless, unit
 from .unit_parser import unit_parser
 
 
@@ -49,29 +54,79 @@ class UnitFamily(HasPrivateTraits):
         self.inverse = inverse
 
 
-class UnitCache(HasTraits):
+class UnitCache(object):
+    """ The cache of the families of member names, see
+        UnitManager.get_family_name().
 
-    max_size = Int(100)
-    cache = Dict
+        A hit is a plain dict lookup: names are evicted in the order they
+        were added, so nothing is recorded when a name is found.  Like the
+        UnitManager, the cache is not thread-safe. """
+
+    def __init__(self, max_size=100):
+        self.cache = OrderedDict()
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_max_size(self):
+        return self._max_size
+
+    def _set_max_size(self, max_size):
+        self._max_size = max_size
+        self._trim(max_size)
+
+    max_size = property(_get_max_size, _set_max_size)
 
     def lookup(self, name):
         """ Tries to find the value for key name in the cache. Throws a
             KeyError if the name is not in the cache. """
 
-        return self.cache[name]
+        try:
+            value = self.cache[name]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    def get(self, name, default=None):
+        """ Returns the value for key name, or default if it is not cached.
+            """
+
+        try:
+            return self.lookup(name)
+        except KeyError:
+            return default
 
     def add(self, name, value):
+        """ Caches value under key name, evicting the oldest names if the
+            cache is full. """
 
-        if len(self.cache) < self.max_size:
-            self.cache[name] = value
-        else:
-            # randomly remove an item from the cache to make way for the
-            # new one
-            self.cache.popitem()
-            self.cache[name] = value
+        if name not in self.cache:
+            self._trim(self._max_size - 1)
+            if self._max_size < 1:
+                return
+        self.cache[name] = value
 
     def reset(self):
-        self.cache = {}
+        """ Removes all entries, e.g. when the members change. """
+
+        self.cache.clear()
+
+    def cache_info(self):
+        """ Returns a CacheInfo tuple describing the state of the cache. """
+
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         self._max_size, len(self.cache))
+
+    def __len__(self):
+        return len(self.cache)
+
+    def _trim(self, size):
+        while len(self.cache) > max(size, 0):
+            self.cache.popitem(last=False)
+            self.evictions += 1
 
 
 class UnitManager(HasPrivateTraits):
@@ -89,17 +144,35 @@ class UnitManager(HasPrivateTraits):
     default_system = Instance(UnitSystem)
     unit_families = Dict(Str, Instance(UnitFamily))
 
+    # The number of member names whose family is cached by
+    # get_family_name().
+    family_cache_size = Int(200)
+
     _family_cache = Instance(UnitCache)
 
-    def __init__(self):
+    def __init__(self, family_cache_size=200):
         """ Creates a new unit manager. """
 
-        self._family_cache = UnitCache(max_size=200)
+        self._family_cache = UnitCache(max_size=family_cache_size)
+        self.family_cache_size = family_cache_size
+        # The member names with wildcards, in the order they are tried, their
+        # translation to regular expressions, and the regular expression
+        # matching any of them, compiled when first needed.
         self._wildcards = []
+        self._wildcard_patterns = []
+        self._wildcard_matcher = None
+        # The valid units of each family, and the first family having each
+        # unit among its valid units, built when first needed and dropped
+        # whenever the unit systems, families or members change.
+        self._valid_units = {}
+        self._unit_families_index = None
+        # The results of is_compatible() and the dimensions it allows for
+        # each family, which also depend on the default system.
+        self._compatibility_cache = LRUCache(max_size=1024)
+        self._allowed_dimensions = {}
         # instantiate default UnitDB object using default text files:
         udb = UnitDB()
-        udb.get_family_members_from_file()
-        udb.get_unit_families_from_file()
+        udb.load()
 
         # Add each unit system from unit_db defaults
         for udb_sys in udb.unit_systems:
@@ -128,7 +201,7 @@ class UnitManager(HasPrivateTraits):
 
         for name in udb.member_names:
             if name.find('*') != -1:
-                self._wildcards.append(name)
+                self._add_wildcard(name)
 
         # Load unit converters from default_unit_converters file
         self.unit_converters = default_unit_converters
@@ -231,7 +304,7 @@ class UnitManager(HasPrivateTraits):
 
         self.unit_members[member_name] = family
         if member_name.find('*') != -1:
-            self._wildcards.append(member_name)
+            self._add_wildcard(member_name)
         # clear out the cache
         self._family_cache.reset()
 
@@ -248,67 +321,77 @@ class UnitManager(HasPrivateTraits):
         if name == '' or name is None:
             return 'unknown'
 
-        try:
-            # if this name appears in our lookup cache then just return the
-            # result
-            return self._family_cache.lookup(name)
-        except KeyError:
-            pass
-
-        # Strip off common prefix that will cause matching to fail.
-        if name.startswith('copy_of'):
-            name = name[8:]
-
-        orig_name = name
-
-        # Successively remove _x at end of name and check for match
-        # If name has no '_', this yields name = ''
-        while name != '' and name not in self.unit_members:
-            name = '_'.join(name.split('_')[:-1])
-
-        if name == '':
+        # if this name appears in our lookup cache then just return the
+        # result
+        family_cache = self._family_cache
+        family_name = family_cache.cache.get(name)
+        if family_name is not None:
+            family_cache.hits += 1
+            return family_name
+        family_cache.misses += 1
+
+        member_name = self._find_member(name)
+        if member_name == '':
             # No match yet...
             # Try to more aggressively match by checking for * and ? matches
-            for itm in self._wildcards:
-                if fnmatch(orig_name, itm):
-                    name = itm
-                    break
+            member_name = self._match_wildcards(_strip_prefix(name))
+
+        return self._cache_family(name, member_name)
+
+    def get_family_names(self, names):
+        """ Returns the family names of many member names, e.g. the curve
+            mnemonics of a project, in the order of names.
+
+            Each distinct name is resolved once, and only the names which
+            are not members, even without their suffixes, are matched
+            against the member names with wildcards.  The names are looked
+            up in the cache of get_family_name(), but not added to it so
+            that a large batch does not evict the names in use elsewhere. """
+
+        members = self.unit_members
+        families = {}
+        unmatched = []
+        for name in names:
+            if name in families:
+                continue
+            if name == '' or name is None:
+                family_name = 'unknown'
+            else:
+                family_name = self._family_cache.get(name)
+                if family_name is None:
+                    member_name = self._find_member(name)
+                    if member_name == '':
+                        unmatched.append(name)
+                    else:
+                        family_name = members[member_name]
+            families[name] = family_name
+
+        for name in unmatched:
+            member_name = self._match_wildcards(_strip_prefix(name))
+            if member_name == '':
+                families[name] = 'unknown'
+            else:
+                families[name] = members[member_name]
 
-        # Still no match
-        if name == '':
-            family_name = 'unknown'
-        else:
-            family_name = self.unit_members[name]
+        return [families[name] for name in names]
 
-        self._family_cache.add(orig_name, family_name)
+    def family_cache_info(self):
+        """ Returns the hits, misses, evictions and size of the cache of
+            get_family_name() as a CacheInfo tuple. """
 
-        return family_name
+        return self._family_cache.cache_info()
 
     def get_valid_units(self, family_name):
         """ Returns a list of units that are compatible with
             a family given a family name (or alias)"""
 
-        valid_units = []
-        # get family name, just in case an alias was provided
-        family_name = self.get_family_name(family_name)
-
-        for usys in self.unit_systems:
-            unit = usys.units(family_name)
-            if unit not in valid_units:
-                valid_units.append(unit)
-
-        valid_units.sort(key=lambda x: x.label)
-
-        return valid_units
+        return list(self._get_valid_units(family_name).units)
 
     def get_valid_unit_strings(self, family_name):
         """ Returns a list of units that are compatible with
             a family given a family name (or alias)"""
 
-        valid_units = sorted(
-            [x.label for x in self.get_valid_units(family_name)])
-
-        return valid_units
+        return list(self._get_valid_units(family_name).labels)
 
     def get_inverse_family_name(self, family_name):
         """ Returns the inverse family name of the given family name
@@ -333,10 +416,20 @@ class UnitManager(HasPrivateTraits):
         return self.preferred_names[inverse_family]
 
     def get_family_name_for_value(self, unit_value):
-        """ Walks the unit_db looking for a unit with a matching value.
-            This is potentially expensive, so only do it if you must.
+        """ Returns the first family having a unit equal to unit_value among
+            its valid units, or None.
 
+            Units are looked up in an index of the valid units of all the
+            families, which is built on the first call.
         """
+        if isinstance(unit_value, unit):
+            index = self._get_unit_families_index()
+            try:
+                return index.get(unit_value)
+            except TypeError:
+                # Units with array values cannot be indexed.
+                pass
+
         for family_name in self.unit_families:
             if unit_value in self.get_valid_units(family_name):
                 return family_name
@@ -347,37 +440,28 @@ class UnitManager(HasPrivateTraits):
         """ Returns True if the family_name and units are compatible.
         Just because two units have the same derivation, does not mean they
         are compatible, it just means that value conversion is simple.
-        """
-        if units is None:
-            units_label = None
 
+        The results are cached on the identity of units (or the label and
+        the generation of the unit parser, if units is a string) and the
+        family name.
+        """
+        if isinstance(units, str):
+            # Extending the unit parser may change the units of a label.
+            key = (units, family_name, unit_parser.parser.generation)
         elif isinstance(units, unit):
-            units_label = units.label
-
-        elif isinstance(units, str):
-            units_label = units
-            units = unit_parser.parse_unit(units)
-
-        # Unknown logs are not unit converted
-        # so any unit name is ok
-        if family_name == 'unknown':
-            return True
-
-        if units_label in self.get_valid_unit_strings(family_name):
-            return True
-
-        if family_name != 'none' and units_label in ['none', 'unknown']:
-            return False
-
-        try:
-            default_units = self.default_units_for(family_name)
-            unit_convert(1.0, units, default_units)
-            return True
+            key = (id(units), family_name)
+        else:
+            return self._is_compatible(units, family_name)
 
-        except:
-            pass
+        # The cached units are kept so that their identity cannot be reused.
+        entry = self._compatibility_cache.get(key)
+        if entry is not None and (entry[0] is units or
+                                  isinstance(units, str)):
+            return entry[1]
 
-        return False
+        result = self._is_compatible(units, family_name)
+        self._compatibility_cache.add(key, (units, result))
+        return result
 
     def are_compatible_families(self, family1, family2):
         """ Returns True if family2 is compatible with family1.
@@ -462,6 +546,196 @@ class UnitManager(HasPrivateTraits):
     # Private Interface
     ##########################################################################
 
+    def _find_member(self, name):
+        """ Returns the member name matching name once its prefix and as many
+            '_x' suffixes as needed are removed, or '' if there is none. """
+
+        name = _strip_prefix(name)
+
+        # Successively remove _x at end of name and check for match
+        # If name has no '_', this yields name = ''
+        while name != '' and name not in self.unit_members:
+            name = name.rpartition('_')[0]
+
+        return name
+
+    def _cache_family(self, name, member_name):
+        """ Caches and returns the family of the member name matching name.
+            """
+
+        # Still no match
+        if member_name == '':
+            family_name = 'unknown'
+        else:
+            family_name = self.unit_members[member_name]
+
+        self._family_cache.add(name, family_name)
+
+        return family_name
+
+    def _is_compatible(self, units, family_name):
+        """ Decides is_compatible() from the valid labels and the dimensions
+            of the default units of the family. """
+
+        if units is None:
+            units_label = None
+
+        elif isinstance(units, unit):
+            units_label = units.label
+
+        elif isinstance(units, str):
+            units_label = units
+            units = unit_parser.parse_unit(units)
+
+        # Unknown logs are not unit converted
+        # so any unit name is ok
+        if family_name == 'unknown':
+            return True
+
+        if units_label in self._get_valid_units(family_name).label_set:
+            return True
+
+        if family_name != 'none' and units_label in ['none', 'unknown']:
+            return False
+
+        # Units which can be converted to the default units of the family.
+        default_units, dimension_keys = \
+            self._get_allowed_dimensions(family_name)
+        if isinstance(units, unit):
+            return units._dimension_key() in dimension_keys
+        return units is None and default_units is None
+
+    def _get_allowed_dimensions(self, family_name):
+        """ Returns the default units of a family and the dimensions of the
+            units which can be converted to them, directly or as their
+            inverse. """
+
+        try:
+            return self._allowed_dimensions[family_name]
+        except KeyError:
+            pass
+
+        default_units = self.default_units_for(family_name)
+        if default_units is None:
+            dimension_keys = frozenset()
+        else:
+            # Plain numbers are dimensionless.
+            if not isinstance(default_units, unit):
+                default_units = dimensionless
+            dimension_keys = frozenset([
+                default_units._dimension_key(),
+                default_units._inverse_dimension_key(),
+            ])
+
+        result = (default_units, dimension_keys)
+        self._allowed_dimensions[family_name] = result
+        return result
+
+    def _get_valid_units(self, family_name):
+        """ Returns the valid units of a family name (or alias) as a
+            _ValidUnits tuple. """
+
+        # get family name, just in case an alias was provided
+        family_name = self.get_family_name(family_name)
+        try:
+            return self._valid_units[family_name]
+        except KeyError:
+            pass
+
+        valid_units = []
+        for usys in self.unit_systems:
+            unit = usys.units(family_name)
+            if unit not in valid_units:
+                valid_units.append(unit)
+
+        valid_units.sort(key=lambda x: x.label)
+        labels = sorted(x.label for x in valid_units)
+
+        result = _ValidUnits(tuple(valid_units), tuple(labels),
+                             frozenset(labels))
+        self._valid_units[family_name] = result
+        return result
+
+    def _get_unit_families_index(self):
+        """ Returns the index of get_family_name_for_value(). """
+
+        index = self._unit_families_index
+        if index is None:
+            index = {}
+            for family_name in self.unit_families:
+                for valid_unit in self.get_valid_units(family_name):
+                    if isinstance(valid_unit, unit):
+                        try:
+                            index.setdefault(valid_unit, family_name)
+                        except TypeError:
+                            pass
+            self._unit_families_index = index
+        return index
+
+    def _reset_unit_indexes(self):
+        """ Drops the lookups derived from the unit systems, families and
+            members, which are rebuilt when next needed. """
+
+        self._valid_units = {}
+        self._unit_families_index = None
+        self._reset_compatibility()
+
+    def _reset_compatibility(self):
+        """ Drops the results of is_compatible(). """
+
+        self._compatibility_cache = LRUCache(max_size=1024)
+        self._allowed_dimensions = {}
+
+    def _default_system_changed(self):
+        self._reset_compatibility()
+
+    def _unit_systems_changed(self):
+        self._reset_unit_indexes()
+
+    def _unit_systems_items_changed(self):
+        self._reset_unit_indexes()
+
+    def _unit_families_changed(self):
+        self._reset_unit_indexes()
+
+    def _unit_families_items_changed(self):
+        self._reset_unit_indexes()
+
+    def _unit_members_changed(self):
+        self._reset_unit_indexes()
+
+    def _unit_members_items_changed(self):
+        self._reset_unit_indexes()
+
+    def _add_wildcard(self, member_name):
+        """ Adds a member name with wildcards to those tried last by
+            get_family_name(). """
+
+        self._wildcards.append(member_name)
+        self._wildcard_patterns.append(
+            '(?P<_%d>%s)' % (len(self._wildcard_patterns),
+                             translate(os.path.normcase(member_name))))
+        self._wildcard_matcher = None
+
+    def _match_wildcards(self, name):
+        """ Returns the first member name with wildcards matching name, as
+            fnmatch() would, or '' if there is none. """
+
+        if not self._wildcards:
+            return ''
+        if self._wildcard_matcher is None:
+            # A single regular expression trying the member names in order.
+            self._wildcard_matcher = re.compile(
+                '|'.join(self._wildcard_patterns))
+        match = self._wildcard_matcher.match(os.path.normcase(name))
+        if match is None:
+            return ''
+        return self._wildcards[int(match.lastgroup[1:])]
+
+    def _family_cache_size_changed(self, new):
+        if self._family_cache is not None:
+            self._family_cache.max_size = new
+
     # TODO: this method does not seem to ever be called--consider deleting.
     def _convert(self, value, from_units, to_units):
 
@@ -475,9 +749,33 @@ class UnitManager(HasPrivateTraits):
 
         return converted_data
 
-# The as-yet unenforced singleton instance
+#: The valid units of a family, sorted by label, their sorted labels and the
+#: set of their labels.
+_ValidUnits = namedtuple('_ValidUnits', ['units', 'labels', 'label_set'])
+
+
+def _strip_prefix(name):
+    """ Strips off common prefix that will cause matching to fail. """
+
+    if name.startswith('copy_of'):
+        name = name[8:]
+    return name
+
+
+# The as-yet unenforced singleton instance, created when first used, see
+# __getattr__().
+_unit_manager = LazyInstance(UnitManager)
+
+
+def __getattr__(name):
+    """ Returns the unit manager singleton as ``unit_manager``, creating it
+        when the name is first looked up. """
 
-unit_manager = UnitManager()
+    if name == 'unit_manager':
+        instance = _unit_manager.get_instance()
+        globals()['unit_manager'] = instance
+        return instance
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 class IncompatibleUnitFamilies(Exception):
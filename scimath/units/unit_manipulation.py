@@ -29,6 +29,7 @@ from numpy import ndarray
 
 # Enthought library imports
 import scimath.units as units
+from scimath.units.convert import resolve_dtype
 
 # Numerical modeling library imports
 from scimath.units.unit_array import UnitArray
@@ -99,10 +100,22 @@ def manipulate_units(units, converters, *args):
     return results
 
 
-def convert_units(units, *args):
+def convert_units(units, *args, dtype=None):
+    """ Convert the UnitArrays in \*args to the given units.
+
+    dtype is the dtype policy used for the conversions; see
+    `scimath.units.convert.convert`.
+    """
+    if dtype is None:
+        converter = unit_array_units_converter
+    else:
+        def converter(unit_array, new_units):
+            return unit_array_units_converter(unit_array, new_units,
+                                              dtype=dtype)
+
     converters = {
         # UnitScalar: ... # 'UnitScalar' is a subtype of 'UnitArray'
-        UnitArray: unit_array_units_converter,
+        UnitArray: converter,
     }
     return manipulate_units(units, converters, *args)
 
@@ -147,20 +160,32 @@ def strip_units(*args):
 # Convert objects with units to the same type of object with new units.
 
 
-def unit_array_units_converter(unit_array, new_units):
+def unit_array_units_converter(unit_array, new_units, inplace=False,
+                               dtype=None):
     """ Convert a UnitArray from one set of units to another.
+
+    If inplace is True, the data of unit_array is converted in place and
+    unit_array itself is returned with its units set to new_units.  dtype is
+    the dtype policy of the conversion (see `scimath.units.convert.convert`);
+    it also applies when no conversion is needed.
     """
     if unit_array.units != new_units:
         # Need conversion.
-        if isinstance(unit_array, ndarray) and unit_array.shape != ():
+        if inplace:
+            return unit_array.as_units(new_units, inplace=True, dtype=dtype)
+        elif isinstance(unit_array, ndarray) and unit_array.shape != ():
             # this is an array
             result = UnitArray(units.convert(unit_array.view(ndarray), unit_array.units,
-                                             new_units))
+                                             new_units, dtype=dtype),
+                               copy=False)
         else:
             # this is a scalar
             result = UnitScalar(units.convert(unit_array.view(ndarray), unit_array.units,
-                                              new_units))
+                                              new_units, dtype=dtype))
         result.units = new_units
+    elif dtype is not None:
+        result = unit_array.astype(resolve_dtype(unit_array, dtype),
+                                   copy=False)
     else:
         # No conversion needed.  Just return the unit_array.
         result = unit_array
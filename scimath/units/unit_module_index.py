@@ -0,0 +1,179 @@
+# (C) Copyright 2005-2024 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" The unit module to import for each of the names known to the Parser.
+
+The Parser looks names up here so that it only imports the unit modules it
+needs (see Parser._loadName).  A name is listed under the first of the unit
+modules which holds the unit the name stands for when all the modules are
+loaded, i.e. the unit bound by the last module defining the name.
+
+The test suite checks the table against the unit modules.  After adding
+units, run this module as a script to print an updated table::
+
+    python -m scimath.units.unit_module_index
+"""
+
+# Standard library imports.
+from importlib import import_module
+import textwrap
+
+
+#: The names of the units, by the unit module which provides them.
+unit_names = {
+    'SI': (
+        'ampere', 'atto', 'becquerel', 'candela', 'centi', 'coulomb', 'deci',
+        'deka', 'dimensionless', 'exa', 'farad', 'femto', 'giga', 'gray',
+        'hecto', 'henry', 'hertz', 'joule', 'katal', 'kilo', 'kilogram',
+        'lumen', 'lux', 'mega', 'meter', 'micro', 'milli', 'mole', 'nano',
+        'newton', 'none', 'ohm', 'pascal', 'peta', 'pico', 'radian', 'second',
+        'siemens', 'sievert', 'steradian', 'tera', 'tesla', 'volt', 'watt',
+        'weber', 'yocto', 'yotta', 'zepto', 'zetta',
+    ),
+    'acceleration': (
+        'f_per_s2', 'feet_per_second_squared', 'foot', 'ft_per_s2', 'm_per_s2',
+        'meters_per_second_squared',
+    ),
+    'angle': (
+        'circle', 'circles', 'deg', 'degree', 'degrees', 'gon', 'gons', 'grad',
+        'grads', 'mil', 'mils', 'quadrant', 'quadrants', 'radians',
+        'revolution', 'revolutions', 'right_angle', 'right_angles', 'sextant',
+        'sextants', 'sign', 'signs', 'turn', 'turns',
+    ),
+    'area': (
+        'acre', 'b', 'barn', 'barns', 'bn', 'centimeter', 'hectare', 'inch',
+        'mile', 'square_centimeter', 'square_foot', 'square_inch',
+        'square_meter', 'square_mile',
+    ),
+    'density': (
+        'cubic_centimeter', 'cubic_meter', 'g_per_c3', 'g_per_cc', 'g_per_cm3',
+        'gcc', 'gm_per_c3', 'gm_per_cc', 'gm_per_cm3', 'gram', 'grams_per_cc',
+        'grams_per_cubic_centimeter', 'kg_per_m3', 'kilograms_per_cubic_meter',
+        'pound', 'us_fluid_gallon',
+    ),
+    'dimensionless': (
+        'dim', 'frac', 'fract', 'fraction', 'fractional', 'one',
+        'parts_per_million', 'parts_per_one', 'pct', 'percent', 'percentage',
+        'ppm', 'ratio',
+    ),
+    'electromagnetism': (
+        'amp', 'amperes', 'amps', 'henrys', 'mA', 'mS', 'mSiemen', 'mSiemens',
+        'mf', 'mho', 'micro_farad', 'milli_amp', 'milli_ampere', 'milli_volt',
+        'millivolt', 'millivolts', 'mmho', 'mv', 'ohm_m', 'ohm_meter', 'ohmm',
+        'ohms', 'ohms_per_m', 'ohms_per_meter', 'pf', 'pico_farad', 'siemen',
+        'siemens_per_m', 'siemens_per_meter', 'teslas', 'v', 'volts', 'webers',
+    ),
+    'energy': (
+        'Btu', 'Calorie', 'GeV', 'J', 'KeV', 'MJ', 'MeV', 'cal', 'calorie',
+        'eV', 'electron_volt', 'erg', 'foot_pound', 'horse_power_hour', 'kJ',
+        'kcal', 'kilowatt_hour',
+    ),
+    'force': (
+        'N', 'lbf', 'lbs',
+    ),
+    'frequency': (
+        'Hz', 'RPM', 'hz', 'khz', 'kilohertz', 'minute', 'rpm',
+    ),
+    'length': (
+        'IN', 'angstrom', 'astronomical_unit', 'centimeters', 'cm', 'f',
+        'fathom', 'feet', 'fermi', 'ft', 'inches', 'kilometer', 'kilometers',
+        'km', 'light_year', 'm', 'meters', 'micrometer', 'micron',
+        'millimeter', 'millimeters', 'mm', 'nanometer', 'nautical_mile', 'nm',
+        'parsec', 'survey_foot', 'um', 'us_feet', 'us_foot', 'yard',
+    ),
+    'mass': (
+        'centigram', 'cg', 'g', 'gm', 'grams', 'kg', 'kilograms', 'lb',
+        'metric_ton', 'mg', 'milligram', 'ounce', 'pounds', 'ton',
+    ),
+    'power': (
+        'horsepower', 'kilowatt', 'kw',
+    ),
+    'pressure': (
+        'GPA', 'GPa', 'Gpa', 'MPA', 'MPa', 'Mpa', 'Pa', 'apsi', 'atm',
+        'atmosphere', 'bar', 'bars', 'gpa', 'inHg', 'kPa', 'kbar', 'kbars',
+        'kilobar', 'millibar', 'mpa', 'pounds_per_square_inch', 'psi', 'psig',
+        'torr',
+    ),
+    'speed': (
+        'f_per_s', 'f_per_sec', 'feet_per_second', 'ft_per_s', 'ft_per_sec',
+        'hour', 'kilometers_per_second', 'km_per_s', 'km_per_sec', 'knot',
+        'm_per_s', 'm_per_sec', 'meters_per_millisecond', 'meters_per_second',
+        'miles_per_hour', 'millisecond',
+    ),
+    'substance': (
+        'kmol', 'mol',
+    ),
+    'temperature': (
+        'K', 'celsius', 'degC', 'degF', 'degK', 'degc', 'degf', 'degk',
+        'fahrenheit', 'kelvin', 'rankine',
+    ),
+    'time': (
+        'day', 'days', 'hours', 'microsecond', 'microseconds', 'milliseconds',
+        'minutes', 'ms', 'msec', 'nanosecond', 'ns', 'picosecond', 'ps', 's',
+        'sec', 'seconds', 'us', 'usec', 'week', 'weeks', 'year', 'years',
+    ),
+    'volume': (
+        'V', 'barrel', 'bbl', 'c3', 'cc', 'cm3', 'cubic_foot', 'cubic_inch',
+        'cuft', 'f3', 'ft3', 'gallon', 'gallons', 'liter', 'liters', 'm3',
+        'us_fluid_ounce', 'us_fluid_quart', 'us_pint',
+    ),
+    'geo_units': (
+        'MPa_per_100f', 'MPa_per_100ft', 'MPa_per_f', 'MPa_per_ft',
+        'MPa_per_m', 'api', 'barns_per_electron', 'g_ft_per_cc_s',
+        'g_km_per_cc_s', 'gapi', 'lb_per_gal', 'lb_per_gallon', 'mrayl', 'ppg',
+        'psi_per_f', 'psi_per_ft', 'rayl', 'us_per_ft',
+    ),
+}
+
+
+def build_unit_names(unit_modules):
+    """ Returns the table of `unit_names` for the given unit modules, by
+    importing them.
+    """
+    from scimath.units.unit_parser import _is_unit_value
+
+    modules = [(module_name, import_module('scimath.units.' + module_name))
+               for module_name in unit_modules]
+    # The context of a fully loaded Parser.
+    context = {}
+    for module_name, module in modules:
+        context.update(module.__dict__)
+
+    names = dict((module_name, []) for module_name in unit_modules)
+    for name, value in context.items():
+        if not _is_unit_value(value):
+            continue
+        for module_name, module in modules:
+            if name in module.__dict__ and module.__dict__[name] is value:
+                names[module_name].append(name)
+                break
+    return dict((module_name, tuple(sorted(module_names)))
+                for module_name, module_names in names.items())
+
+
+def format_unit_names(names):
+    """ Returns the source of the definition of `unit_names`.
+    """
+    lines = ['unit_names = {']
+    for module_name, module_names in names.items():
+        lines.append('    %r: (' % module_name)
+        lines.extend(textwrap.wrap(
+            ' '.join('%r,' % name for name in module_names), width=79,
+            initial_indent=' ' * 8, subsequent_indent=' ' * 8,
+            break_on_hyphens=False))
+        lines.append('    ),')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    from scimath.units.unit_parser import Parser
+
+    print(format_unit_names(build_unit_names(Parser.unit_modules)))
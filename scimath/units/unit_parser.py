@@ -18,13 +18,20 @@
 
 # Standard library imports.
 import ast
+from collections import namedtuple
+from importlib import import_module
 import logging
+import os
 import re
+import threading
 
 # Local imports.
+from scimath.units import registry_cache, unit_module_index
+from scimath.units.lru_cache import LRUCache
 from scimath.units.unit import unit
 from scimath.units.SI import dimensionless
 from scimath.units.smart_unit import SmartUnit
+from scimath.units.unit_expression import compile_unit_expression
 
 
 logger = logging.getLogger(__name__)
@@ -32,118 +39,381 @@ logger = logging.getLogger(__name__)
 
 # factory method
 def parser():
-    return Parser()
-
-# implementation of the Parser singleton
-
-
-class Singleton:
-    __shared_state = {}
+    """ Returns the Parser shared by the unit parsers.
+    """
+    return _shared_parser
+
+
+#: The state of a Parser: its context, the exact labels of its units, whether
+#: all the unit modules are loaded, the modules passed to extend() before they
+#: were and the names these define, which take precedence over the unit
+#: modules, whether the parser was extended and its generation.  A state is
+#: never modified once published; a new one replaces it.
+_ParserState = namedtuple('_ParserState', [
+    'context', 'exact_labels', 'loaded', 'extensions', 'overrides',
+    'extended', 'generation',
+])
+
+
+class Parser(object):
+    """ Evaluates unit expressions over the units of the unit modules.
+
+    The unit modules are loaded lazily: a module is only imported when one
+    of the names it provides, as listed in `unit_module_index`, is first
+    looked up in `context`.  All the modules are loaded when the whole
+    context or the exact labels of the units are needed.
+
+    Each parser has its own units; `parser()` returns the one shared by the
+    unit parsers.  A parser is safe to use from several threads.  Its context
+    and exact labels are a snapshot which is never modified: loading a unit
+    module, loading all of them and extending the parser build a new
+    snapshot under a lock and publish it in a single assignment.  Evaluating
+    an expression reads one snapshot, and all the evaluation state is local
+    to the call.
+    """
+
+    #: The modules defining the units known to the parser.  When several
+    #: modules define a name, the last one wins.
+    unit_modules = [
+        'SI', 'acceleration', 'angle', 'area', 'density', 'dimensionless',
+        'electromagnetism', 'energy', 'force', 'frequency', 'length', 'mass',
+        'power', 'pressure', 'speed', 'substance', 'temperature', 'time',
+        'volume', 'geo_units',
+    ]
+
+    #: The SI names used in the derivations and labels which are not defined
+    #: by the unit modules, and the names of the units they stand for.
+    context_aliases = {'A': 'amp', 'cd': 'candela', 'S': 'siemens'}
 
     def __init__(self):
-        self.__dict__ = self.__shared_state
-
-
-class Parser(Singleton):
+        # Guards the publishing of new states.  Reentrant, as loading a name
+        # may load all the modules.
+        self._lock = threading.RLock()
+        self._name_index = None
+        self._state = self._emptyState(generation=0)
 
     def extend(self, *modules):
-        for module in modules:
-            self.context.update(module.__dict__)
-        self._cleanContext(self.context)
-        self._cacheExactLabels()
+        with self._lock:
+            state = self._state
+            context = self._newContext(state.context, modules)
+            if not state.loaded:
+                # Recorded to be applied after the unit modules when they are
+                # loaded.
+                overrides = dict(state.overrides)
+                for module in modules:
+                    overrides.update(module.__dict__)
+                state = state._replace(
+                    context=context, extensions=state.extensions + modules,
+                    overrides=overrides)
+            else:
+                state = state._replace(
+                    context=context, exact_labels=self._exactLabels(context))
+            # Tell the users of the parser that cached results may be stale.
+            self._state = state._replace(
+                extended=state.extended or bool(modules),
+                generation=state.generation + 1)
 
     def parse(self, string):
-        # FIXME: we should compile this to an AST, whitelist the
-        # arithmetic operations, numbers, and the names in our context
-        # before evaluating.
-        self.context['__builtins__'] = None
+        """ Evaluates a unit expression over the units of the context.
+
+        The expression is compiled once into a program which can only look
+        up the names in the context, see `compile_unit_expression`.  Labels
+        which are not expressions, such as 'ft/s^2', are looked up in the
+        exact labels of the units.
+        """
         try:
-            value = eval(string, self.context)
+            return compile_unit_expression(string).evaluate(self.context)
         except Exception:
-            if string in self.exact_labels:
-                return self.exact_labels[string]
+            exact_labels = self.exact_labels
+            if string in exact_labels:
+                return exact_labels[string]
             else:
                 raise
-        finally:
-            self.context.pop('__builtins__', None)
-        return value
+
+    @property
+    def context(self):
+        """ The units and numbers expressions are evaluated over, by name.
+        """
+        return self._state.context
+
+    @property
+    def exact_labels(self):
+        """ The units of the context, keyed by their labels.
+        """
+        if not self._state.loaded:
+            self.load()
+        return self._state.exact_labels
+
+    @property
+    def extended(self):
+        """ Whether units were added with extend() since the last init().
+        """
+        return self._state.extended
+
+    @property
+    def generation(self):
+        """ A number which changes whenever units are added to or removed
+        from the parser, so that the results computed with the parser can be
+        invalidated.
+        """
+        return self._state.generation
+
+    @property
+    def loaded(self):
+        """ Whether all the unit modules have been loaded.
+        """
+        return self._state.loaded
 
     def init(self, *args, **kwds):
-        self._initializeContext()
-
-    def _initializeContext(self):
-        self.context = context = {}
-        modules = self._loadModules()
-        self.extend(*modules)
-
-        # Add the SI names used in the derivations and labels but not
-        # already in the context.
-        context['A'] = context['amp']
-        context['cd'] = context['candela']
-        context['S'] = context['siemens']
+        """ Forgets the units loaded and added to the parser.
+        """
+        with self._lock:
+            self._state = self._emptyState(self._state.generation + 1)
+
+    def load(self, use_snapshot=True, save_snapshot=None):
+        """ Loads all the unit modules into the context.
+
+        The units are loaded from a snapshot (see scimath.units.registry_cache)
+        instead of importing the unit modules, if one was saved and the modules
+        are unchanged.  Unless save_snapshot is given, the units imported from
+        the modules are only saved in a snapshot if requested through the
+        environment (see registry_cache.save_on_load).
+        """
+        with self._lock:
+            state = self._state
+            if state.loaded:
+                return
+
+            fingerprint = self._sourceFingerprint()
+            snapshot = None
+            if use_snapshot:
+                snapshot = registry_cache.load_snapshot('unit_parser',
+                                                        fingerprint)
+            if snapshot is not None:
+                units, exact_labels = snapshot
+                context = _UnitContext(self._loadName)
+                context.update(units)
+            else:
+                context = self._newContext({}, self._loadModules())
+
+                # Add the SI names used in the derivations and labels but not
+                # already in the context.
+                for name, target in self.context_aliases.items():
+                    context[name] = context[target]
+
+                exact_labels = self._exactLabels(context)
+                if save_snapshot is None:
+                    save_snapshot = registry_cache.save_on_load()
+                if save_snapshot:
+                    registry_cache.save_snapshot(
+                        'unit_parser', fingerprint,
+                        (dict(context), exact_labels))
+
+            if state.extensions:
+                context = self._newContext(context, state.extensions)
+                exact_labels = self._exactLabels(context)
+
+            self._state = state._replace(
+                context=context, exact_labels=exact_labels, loaded=True,
+                extensions=(), overrides={})
+
+    def _emptyState(self, generation):
+        return _ParserState(_UnitContext(self._loadName), {}, False, (), {},
+                            False, generation)
+
+    def _newContext(self, units, modules):
+        """ Returns a new context with the given units and the units of the
+        modules.
+        """
+        context = _UnitContext(self._loadName)
+        context.update(units)
+        for module in modules:
+            context.update(module.__dict__)
+        self._cleanContext(context)
         return context
 
+    def _loadName(self, name):
+        """ Returns the value of a name missing from the context, importing
+        the unit module which defines it and publishing a context with its
+        units.  Raises a KeyError if there is no such unit.
+        """
+        with self._lock:
+            # Another thread may have loaded the name, or replaced the
+            # context the name is missing from, in the meantime.
+            state = self._state
+            if dict.__contains__(state.context, name):
+                return dict.__getitem__(state.context, name)
+            # The units the parser was extended with are in the context.
+            if state.loaded or name in state.overrides:
+                raise KeyError(name)
+
+            index = self._nameIndex()
+            if index is None:
+                # Some unit modules are not indexed; load everything.
+                self.load()
+                return self._state.context[name]
+            target = self.context_aliases.get(name, name)
+            module_name = index.get(target)
+            if module_name is None:
+                raise KeyError(name)
+            module = import_module('scimath.units.' + module_name)
+            value = getattr(module, target)
+            if not _is_unit_value(value):
+                raise KeyError(name)
+
+            context = _UnitContext(self._loadName)
+            context.update(state.context)
+            # Add the other units of the module while we are at it.
+            for name_, value_ in module.__dict__.items():
+                if index.get(name_) == module_name and \
+                        name_ not in state.overrides and \
+                        name_ not in self.context_aliases and \
+                        _is_unit_value(value_):
+                    context[name_] = value_
+            context[name] = value
+            self._state = state._replace(context=context)
+            return value
+
+    def _nameIndex(self):
+        """ Returns the name of the unit module to import for each name, or
+        None if some of the unit modules are not in `unit_module_index`.
+        """
+        if self._name_index is None:
+            unit_names = unit_module_index.unit_names
+            if not all(module_name in unit_names
+                       for module_name in self.unit_modules):
+                return None
+            self._name_index = dict(
+                (name, module_name) for module_name in self.unit_modules
+                for name in unit_names[module_name])
+        return self._name_index
+
+    def _modulePaths(self):
+        directory = os.path.dirname(os.path.abspath(__file__))
+        return [os.path.join(directory, module_name + '.py')
+                for module_name in self.unit_modules]
+
+    def _sourceFingerprint(self):
+        """ The fingerprint of the sources of the units in the context.
+        """
+        return registry_cache.source_fingerprint(self._sourcePaths())
+
+    def _sourcePaths(self):
+        """ The paths of the sources of the units in the context.
+        """
+        directory = os.path.dirname(os.path.abspath(__file__))
+        return self._modulePaths() + [
+            os.path.join(directory, module_name + '.py')
+            for module_name in ('unit', 'smart_unit', 'unit_parser')
+        ]
+
     def _cleanContext(self, context):
         """ Remove any non-unit from the context.
 
         Numbers can remain.
         """
         for name in list(context):
-            if not isinstance(context[name], (float, int, unit)):
+            if not _is_unit_value(context[name]):
                 del context[name]
 
-    def _cacheExactLabels(self):
-        self.exact_labels = {}
-        for name, value in self.context.items():
+    def _exactLabels(self, context):
+        """ Returns the units of context keyed by their labels.
+        """
+        exact_labels = {}
+        for name, value in context.items():
             if isinstance(value, unit) and value.label is not None:
-                self.exact_labels[value.label] = value
+                exact_labels[value.label] = value
 
         # Angular minutes and seconds are overridden by the time units of the
         # same name, so explicitly add their labels here.
         from . import angle
 
-        self.exact_labels[angle.minute.label] = angle.minute
-        self.exact_labels[angle.second.label] = angle.second
+        exact_labels[angle.minute.label] = angle.minute
+        exact_labels[angle.second.label] = angle.second
+        return exact_labels
 
     def _loadModules(self):
+        return [import_module('scimath.units.' + module_name)
+                for module_name in self.unit_modules]
 
-        from . import SI
-        from . import acceleration
-        from . import angle
-        from . import area
-        from . import density
-        from . import dimensionless
-        from . import electromagnetism
-        from . import energy
-        from . import force
-        from . import frequency
-        from . import length
-        from . import mass
-        from . import power
-        from . import pressure
-        from . import speed
-        from . import substance
-        from . import temperature
-        from . import time
-        from . import volume
-        from . import geo_units
-
-        modules = [
-            SI, acceleration, angle, area, density, dimensionless,
-            electromagnetism, energy, force, frequency, length, mass, power,
-            pressure, speed, substance, temperature, time, volume, geo_units
-        ]
 
-        return modules
+class _UnitContext(dict):
+    """ The context of the Parser: a dict which calls load_name(name) to
+    get the value of a missing name.
+    """
 
+    def __init__(self, load_name):
+        super(_UnitContext, self).__init__()
+        self._load_name = load_name
 
-class UnitParser:
+    def __missing__(self, name):
+        return self._load_name(name)
 
-    def __init__(self):
 
-        # Init the main unit parser
+def _is_unit_value(value):
+    """ Whether value belongs in the context of the Parser.
+    """
+    return isinstance(value, (float, int, unit))
+
+
+#: The labels which UnitParser resolves without parsing them, for one
+#: generation of the parser, see UnitParser._build_label_index().  Both map a
+#: label to its value and its pretty label (None to keep the label as
+#: written): `units` the names, exact labels, aliases and their dotted forms,
+#: and `folded` the lower case ones, matched by the lower case form of a
+#: label.
+_LabelIndex = namedtuple('_LabelIndex', ['units', 'folded'])
+
+#: The result of UnitParser.parse_units(): the units of the labels, in order,
+#: and the distinct labels which could not be parsed.
+ParsedUnits = namedtuple('ParsedUnits', ['units', 'unknown'])
+
+
+class UnitParser:
+    """ Parses unit labels into SmartUnits.
+
+    A UnitParser can be shared by several threads.  The units it returns are
+    immutable, its cache is thread safe, and each call works with a single
+    version of the label index, which is replaced under a lock when the
+    parser is extended.
+
+    Parameters
+    ----------
+    cache_size : int
+        The number of parsed labels kept in `cache`.
+    """
+
+    #: Alternative spellings of labels, mapped to the label of the unit they
+    #: stand for and the pretty label to give it (None to keep the spelling).
+    aliases = {
+        '%': ('percentage', None),
+        'v/v_decimal': ('v/v', None),
+        '': ('dimensionless', 'none'),
+        'None': ('dimensionless', 'none'),
+    }
+
+    #: Alternative spellings of labels which are matched in any case, in lower
+    #: case.
+    folded_aliases = {
+        'v/v decimal': ('v/v', None),
+        'in': ('inch', None),
+        'unitless': ('dimensionless', 'none'),
+        'unknown': ('dimensionless', 'none'),
+    }
+
+    def __init__(self, cache_size=1024):
+
+        # The parser shared by the unit parsers.
         self.parser = parser()
-        self.parser.init()
+
+        # The units returned by parse_unit, keyed by the label, the suppress
+        # flags and the generation of the parser.  Units are immutable, so
+        # they can be shared.  The cache is cleared whenever the parser is
+        # extended.
+        self.cache = LRUCache(max_size=cache_size)
+        self._cache_generation = None
+        self._label_index = None
+        self._lock = threading.Lock()
 
         # TODO: factor out--adjust to scimath.units
         # In fact, the unit manager should extend this when a new 'system' or
@@ -151,12 +421,118 @@ class UnitParser:
 
         # This is used to clean up labels like ohm.m in remove_dots()
         self.regex = re.compile(r'([A-Za-z])\.([A-Za-z])')
+        # This is used to find the dotted forms of labels like ohm*m.
+        self._star_regex = re.compile(r'([A-Za-z])\*(?=[A-Za-z])')
 
     def parse_unit(self, label, suppress_warnings=True, suppress_unknown=True):
         """ Parses a string description of a unit e.g., 'g/cc'.
         if suppress_unknown is True and the label cannot be parsed, the returned
         unit is dimensionless otherwise UnableToParseUnits is raised.
+
+        Results are cached in `cache`.
+        """
+        generation = self.parser.generation
+        if self._cache_generation != generation:
+            self._reset(only_if_stale=True)
+
+        # Results computed by other threads before the parser was extended
+        # cannot be mistaken for current ones.
+        key = (label, suppress_warnings, suppress_unknown, generation)
+        try:
+            return self.cache.lookup(key)
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable labels are reported by _parse_unit.
+            return self._parse_unit(label, suppress_warnings,
+                                    suppress_unknown)
+
+        _unit = self._parse_unit(label, suppress_warnings, suppress_unknown)
+        # Keep logging the failures to parse a label if asked to.
+        if _unit.valid or suppress_warnings:
+            self.cache.add(key, _unit)
+        return _unit
+
+    def _reset(self, only_if_stale=False):
+        """ Drops the cached units and rebuilds the label index after the
+        parser has been extended.
         """
+        with self._lock:
+            generation = self.parser.generation
+            if only_if_stale and self._cache_generation == generation:
+                # Already done by another thread.
+                return
+            self.cache.clear()
+            # The index is in place before the generation is published.
+            self._label_index = self._build_label_index()
+            self._cache_generation = generation
+
+    def _build_label_index(self):
+        """ Returns the _LabelIndex of the units of the parser, loading them
+        all.
+        """
+        parser = self.parser
+        exact_labels = parser.exact_labels
+        units = {}
+        # Names take precedence over exact labels.  Labels with dots or
+        # offsets are never looked up as written.
+        for values in (exact_labels, parser.context):
+            for label, value in values.items():
+                if self.remove_dots(label) == label and '+' not in label:
+                    units[label] = (value, None)
+
+        # Labels in other cases resolve to the lower case label.
+        folded = dict((label, (entry[0], label))
+                      for label, entry in units.items()
+                      if label.lower() == label)
+
+        for label, entry in list(units.items()):
+            dotted_label = self._star_regex.sub(r'\g<1>.', label)
+            if dotted_label not in units and \
+                    self.remove_dots(dotted_label) == label:
+                units[dotted_label] = (entry[0], label)
+
+        for aliases in (self.aliases, self.folded_aliases):
+            for label, (target, pretty_label) in aliases.items():
+                entry = units.get(target)
+                if entry is None:
+                    try:
+                        entry = (parser.parse(target), None)
+                    except Exception:
+                        # Left to fail in _parse_unit.
+                        continue
+                units[label] = (entry[0], pretty_label)
+                if aliases is self.folded_aliases:
+                    folded[label] = units[label]
+        return _LabelIndex(units, folded)
+
+    def _smart_unit(self, _unit, pretty_label, offset_value=0.0, valid=True):
+        """ Returns the SmartUnit for a parsed unit.
+        """
+        if isinstance(_unit, unit):
+
+            if hasattr(_unit, "offset"):
+                offset = _unit.offset
+            else:
+                offset = 0.0
+
+            offset += offset_value
+
+            return SmartUnit(pretty_label, _unit.value, _unit._dimension_key(),
+                             offset, valid)
+        else:
+            # some dimensionless units such as liters/liters still need to have
+            # pretty labels etc.
+            return SmartUnit(pretty_label, _unit, dimensionless.derivation,
+                             offset_value, valid)
+
+    def _parse_unit(self, label, suppress_warnings, suppress_unknown):
+        index = self._label_index
+
+        # Most labels are names or exact labels of units, or aliases.
+        entry = index.units.get(label)
+        if entry is not None:
+            return self._smart_unit(entry[0], entry[1] or label)
 
         # someone (or some s/w) writes out units like ohm.m
         label = self.remove_dots(label)
@@ -185,56 +561,95 @@ class UnitParser:
                 if not isinstance(offset_value, (int, float)):
                     self._error(label, suppress_warnings, suppress_unknown)
                     valid = False
-                else:
-                    has_offset = True
 
         # make sure we can parse the label ....
-        if label == "%":
-            label = "percentage"
-        if label.lower() == "v/v decimal" or label == "v/v_decimal":
-            label = "v/v"
-        if label.lower() == "in":
-            label = "inch"
-
-        if (label is None or
-                label == '' or
-                label == 'None' or
-                label.lower() == 'unitless' or
-                label.lower() == 'unknown'):
-            label = "dimensionless"
-            pretty_label = "none"
-
-        try:
-            _unit = self.parser.parse(label)
-        except:
-            try:
-                _unit = self.parser.parse(label.lower())
-                pretty_label = label.lower()
-            except:
+        entry = index.units.get(label) or index.folded.get(label.lower())
+        if not valid:
+            _unit = dimensionless
+        elif entry is not None:
+            _unit = entry[0]
+            if entry[1] is not None:
+                pretty_label = entry[1]
+        else:
+            parsed = self._evaluate(label)
+            if parsed is None:
                 self._error(label, suppress_warnings, suppress_unknown)
                 valid = False
+                _unit = dimensionless
+            else:
+                _unit, parsed_label = parsed
+                if parsed_label != label:
+                    pretty_label = parsed_label
 
-        if not valid:
-            _unit = dimensionless
+        return self._smart_unit(_unit, pretty_label, offset_value, valid)
 
-        if isinstance(_unit, unit):
+    def _evaluate(self, label):
+        """ Returns the value of the unit expression label, or else of its
+        lower case form (e.g. 'OHM*M'), with the form which was evaluated.
+        Returns None if neither can be evaluated.
+        """
+        try:
+            return self.parser.parse(label), label
+        except Exception:
+            lower_label = label.lower()
+            if lower_label == label:
+                return None
+        try:
+            return self.parser.parse(lower_label), lower_label
+        except Exception:
+            return None
 
-            if hasattr(_unit, "offset"):
-                offset = _unit.offset
-            else:
-                offset = 0.0
+    def parse_units(self, labels, suppress_warnings=True,
+                    suppress_unknown=True):
+        """ Parses many unit labels, e.g. the curve units of a file header.
 
-            offset += offset_value
+        Each distinct label is parsed once.  Labels which only differ by the
+        dots removed by `remove_dots` are parsed once too.
 
-            _unit = SmartUnit(pretty_label, _unit.value, _unit.derivation,
-                              offset, valid)
-        else:
-            # some dimensionless units such as liters/liters still need to have
-            # pretty labels etc.
-            _unit = SmartUnit(pretty_label, _unit, dimensionless.derivation,
-                              offset_value, valid)
+        Parameters
+        ----------
+        labels : sequence of str
+            The labels to parse.
+        suppress_warnings : bool
+            If False, the labels which cannot be parsed are logged together
+            in one message.
+        suppress_unknown : bool
+            If False and some labels cannot be parsed, a single
+            UnableToParseUnits listing all of them in its `labels` attribute
+            is raised.  Otherwise these labels are parsed as invalid
+            dimensionless units.
 
-        return _unit
+        Returns
+        -------
+        result : ParsedUnits
+            A named tuple of `units`, the list of the units of the labels in
+            the order of labels, and `unknown`, the list of the distinct
+            labels which could not be parsed, in the order they first appear.
+        """
+        labels = list(labels)
+        by_label = {}
+        by_normalized_label = {}
+        unknown = []
+        for label in labels:
+            if label in by_label:
+                continue
+            normalized_label = self.remove_dots(label)
+            _unit = by_normalized_label.get(normalized_label)
+            if _unit is None:
+                _unit = self.parse_unit(label)
+                by_normalized_label[normalized_label] = _unit
+            by_label[label] = _unit
+            if not _unit.valid:
+                unknown.append(label)
+
+        if unknown:
+            if not suppress_warnings:
+                logger.debug('Could not parse units: %s',
+                             ', '.join(map(repr, unknown)))
+            if not suppress_unknown:
+                raise UnableToParseUnits(unknown[0], labels=unknown)
+
+        return ParsedUnits([by_label[label] for label in labels], unknown)
 
     def remove_dots(self, label):
         """ Some LAS files contain units written like 'ohm.m', which this class
@@ -288,15 +703,22 @@ class UnitParser:
 #-------------------------------------------------------------------------
 #  Singleton for unit parsing ....
 #-------------------------------------------------------------------------
+_shared_parser = Parser()
 unit_parser = UnitParser()
 
 
 class UnableToParseUnits(Exception):
 
-    def __init__(self, label):
+    def __init__(self, label, labels=None):
         self.label = label
+        # All the labels which could not be parsed, see
+        # UnitParser.parse_units().
+        self.labels = [label] if labels is None else labels
 
     def __str__(self):
+        if len(self.labels) > 1:
+            return "Labels %s are not parseable unit strings." % \
+                ", ".join("'%s'" % label for label in self.labels)
         str = "Label '%s' is not a parseable unit string." % \
               (self.label)
         return str
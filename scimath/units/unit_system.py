@@ -140,6 +140,22 @@ class UnitSystem(HasTraits):
             inv_name = None
         return inv_name
 
+    #########################################################################
+    # Private Interface
+    #########################################################################
+
+    def _families_changed(self):
+        self._notify_manager()
+
+    def _families_items_changed(self):
+        self._notify_manager()
+
+    def _notify_manager(self):
+        # The manager indexes the units of its systems.
+        reset = getattr(self.unit_manager, '_reset_unit_indexes', None)
+        if reset is not None:
+            reset()
+
 
 # Single copy of the standard unit system used by algorithms.
 
@@ -35,20 +35,14 @@ from .length import meter, centimeter, foot, inch
 # Data taken from Appendix F of Halliday, Resnick, Walker, "Fundamentals of Physics",
 #     fourth edition, John Willey and Sons, 1993
 
-cubic_meter = meter**3
-cubic_meter.label = 'cubic meters'
-cubic_centimeter = centimeter**3
-cubic_centimeter.label = 'cubic centimeters'
-cubic_foot = foot**3
-cubic_foot.label = 'cubic feet'
-cubic_inch = inch**3
-cubic_inch.label = 'cubic_inches'
-
-liter = 1000 * cubic_centimeter
-liter.label = 'liters'
-
-barrel = 5.61458 * cubic_foot
-barrel.label = 'barrel'
+cubic_meter = (meter**3).with_label('cubic meters')
+cubic_centimeter = (centimeter**3).with_label('cubic centimeters')
+cubic_foot = (foot**3).with_label('cubic feet')
+cubic_inch = (inch**3).with_label('cubic_inches')
+
+liter = (1000 * cubic_centimeter).with_label('liters')
+
+barrel = (5.61458 * cubic_foot).with_label('barrel')
 
 us_fluid_ounce = 231. / 128. * cubic_inch
 us_pint = 16 * us_fluid_ounce